@@ -30,6 +30,14 @@ if errorlevel 1 (
     exit /b 1
 )
 echo  [OK] Dependencies installed.
+echo  Provisioning NLTK language data...
+python backend\setup_nltk.py
+if errorlevel 1 (
+    echo  [ERROR] Failed to download NLTK data.
+    pause
+    exit /b 1
+)
+echo  [OK] NLTK data ready.
 
 echo.
 echo  [2/4] Checking for dataset...
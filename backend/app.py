@@ -6,22 +6,36 @@ Implements FR-7.4: RESTful API endpoint for prediction requests.
 import os
 import sys
 import json
+import hmac
 import logging
 import time
 import threading
 import uuid
 from functools import wraps
 
-from flask import Flask, request, jsonify, send_from_directory, abort
+from flask import Flask, Response, request, jsonify, send_from_directory, abort
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
 # Ensure backend dir is on path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from predictor import predict, get_model_metrics, model_is_ready
-from config import MIN_INPUT_CHARS, MAX_INPUT_WORDS, PORT, HOST, DEBUG
-from gemini_analyzer import analyze_with_gemini, gemini_is_available
+from predictor import (
+    predict_cached, predict_batch, reload_model, get_model_metrics, get_stage_timings,
+    get_cache_stats, model_is_ready
+)
+from config import (
+    MIN_INPUT_CHARS, MAX_INPUT_WORDS, MAX_BATCH_SIZE, PORT, HOST, DEBUG,
+    GEMINI_MAX_WORKERS, GEMINI_MAX_QUEUE, GEMINI_RESULT_CAPACITY, GEMINI_RESULT_TTL,
+    GEMINI_JOB_TIMEOUT, GEMINI_RESULT_STORE, GEMINI_RESULT_DB_PATH, GEMINI_RESULT_REDIS_URL,
+    GEMINI_BATCH_SIZE, SSE_HEARTBEAT_SECONDS, ADMIN_TOKEN
+)
+from gemini_analyzer import (
+    analyze_with_gemini, analyze_batch_with_gemini, should_escalate, skipped_analysis,
+    gemini_is_available, get_gemini_stats
+)
+from executor import BoundedExecutor
+from result_store import create_result_store, PENDING, READY, EXPIRED
 
 # Logging setup
 logging.basicConfig(
@@ -83,9 +97,19 @@ except (ImportError, AttributeError):
 app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # 2MB max upload
 ALLOWED_EXTENSIONS = {'txt', 'csv'}
 
-# ── Gemini result cache (in-memory, keyed by request_id) ────────────────────
-_gemini_cache: dict = {}   # { request_id: result_dict | None }
-_gemini_cache_lock = threading.Lock()
+# ── Gemini results (keyed by request_id), held until the client fetches them ─
+# Shared by all workers (GEMINI_RESULT_STORE), so any worker can answer a poll
+_gemini_results = create_result_store(
+    GEMINI_RESULT_STORE, GEMINI_RESULT_CAPACITY, GEMINI_RESULT_TTL, GEMINI_JOB_TIMEOUT,
+    db_path=GEMINI_RESULT_DB_PATH, redis_url=GEMINI_RESULT_REDIS_URL
+)
+
+# Bounded pool for Gemini calls: bursts queue up to a limit, then get ML-only results
+_gemini_executor = BoundedExecutor(GEMINI_MAX_WORKERS, GEMINI_MAX_QUEUE, name='gemini')
+
+# Open /api/predict/events streams in this worker, woken when their job finishes
+_gemini_waiters: dict = {}   # { request_id: threading.Event }
+_gemini_waiters_lock = threading.Lock()
 
 
 def _run_gemini_background(request_id: str, text: str, label: str, confidence: float):
@@ -95,10 +119,25 @@ def _run_gemini_background(request_id: str, text: str, label: str, confidence: f
     except Exception as ge:
         logger.warning(f"Gemini background error: {ge}")
         gemini_result = {'gemini_available': False}
-    with _gemini_cache_lock:
-        _gemini_cache[request_id] = gemini_result
+    _gemini_results.put_result(request_id, gemini_result)
+    with _gemini_waiters_lock:
+        waiter = _gemini_waiters.get(request_id)
+    if waiter is not None:
+        waiter.set()
     logger.info(f"Gemini background result stored for {request_id}")
 
+
+def _run_gemini_batch_background(request_ids: list, items: list):
+    """Run batched Gemini analysis in a background thread and store each result."""
+    try:
+        gemini_results = analyze_batch_with_gemini(items)
+    except Exception as ge:
+        logger.warning(f"Gemini batch background error: {ge}")
+        gemini_results = [{'gemini_available': False}] * len(items)
+    for request_id, gemini_result in zip(request_ids, gemini_results):
+        _gemini_results.put_result(request_id, gemini_result)
+    logger.info(f"Gemini background results stored for {len(request_ids)} batch item(s)")
+
 # ─────────────────────────────────────────────
 # Helpers
 # ─────────────────────────────────────────────
@@ -119,6 +158,87 @@ def validate_text(text: str) -> tuple[bool, str]:
     return True, ""
 
 
+def _dispatch_gemini(result: dict, text: str, requested: bool = False,
+                     waiter: threading.Event = None) -> str:
+    """
+    Apply the escalation policy and, if it says so, queue background Gemini analysis
+    for a prediction. Annotates the result with its request_id and gemini status.
+    `waiter`, if given, is set when the job finishes.
+
+    Returns:
+        'queued', 'skipped' (ML confident enough; ML-only result) or
+        'rejected' (executor queue full; ML-only result).
+    """
+    escalate, reason = should_escalate(result['confidence'], requested)
+    if not escalate:
+        result['request_id'] = None
+        result['gemini'] = {**skipped_analysis(result['label'], result['confidence']), 'pending': False}
+        return 'skipped'
+
+    request_id = str(uuid.uuid4())
+    result['request_id'] = request_id
+    result['gemini'] = {'gemini_available': False, 'pending': True, 'queued': True, 'escalation': reason}
+
+    _gemini_results.put_pending(request_id)
+    if waiter is not None:
+        with _gemini_waiters_lock:
+            _gemini_waiters[request_id] = waiter
+    queued = _gemini_executor.submit(
+        _run_gemini_background, request_id, text, result['label'], result['confidence']
+    )
+    if not queued:
+        # Backpressure: every Gemini worker and queue slot is busy
+        _gemini_results.discard(request_id)
+        result['gemini'] = {'gemini_available': False, 'pending': False, 'queued': False}
+        return 'rejected'
+    return 'queued'
+
+
+def _dispatch_gemini_batch(results: list, texts: list) -> int:
+    """
+    Queue batched background Gemini analysis for several predictions, one job per
+    GEMINI_BATCH_SIZE items so each job is a single upstream call. Annotates each
+    result like _dispatch_gemini(); items whose job was rejected get ML-only results.
+
+    Returns:
+        Number of items queued.
+    """
+    request_ids = []
+    for result in results:
+        _, reason = should_escalate(result['confidence'], requested=True)
+        result['request_id'] = str(uuid.uuid4())
+        result['gemini'] = {'gemini_available': False, 'pending': True, 'queued': True, 'escalation': reason}
+        request_ids.append(result['request_id'])
+        _gemini_results.put_pending(result['request_id'])
+
+    queued = 0
+    step = max(1, GEMINI_BATCH_SIZE)
+    for start in range(0, len(results), step):
+        chunk = results[start:start + step]
+        items = [(text, r['label'], r['confidence']) for text, r in zip(texts[start:start + step], chunk)]
+        if _gemini_executor.submit(_run_gemini_batch_background, request_ids[start:start + step], items):
+            queued += len(chunk)
+            continue
+        for result in chunk:
+            _gemini_results.discard(result['request_id'])
+            result['request_id'] = None
+            result['gemini'] = {'gemini_available': False, 'pending': False, 'queued': False}
+    return queued
+
+
+def _deep_analysis_requested(data) -> bool:
+    """True if the client asked for Gemini analysis regardless of ML confidence."""
+    flag = (data or request.values).get('deep_analysis', False)
+    if isinstance(flag, str):
+        return flag.strip().lower() in ('1', 'true', 'yes')
+    return bool(flag)
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, cls=NumpyEncoder)}\n\n"
+
+
 def api_response(data: dict, status: int = 200):
     """Standardized API response wrapper using safe numpy-aware encoder."""
     from flask import current_app
@@ -170,8 +290,9 @@ def health_check():
 def predict_endpoint():
     """
     Main prediction endpoint (FR-7.x) — fast path.
-    Returns ML result immediately; Gemini runs in background.
-    Accepts JSON: { "text": "..." }
+    Returns ML result immediately; Gemini runs in background when the escalation
+    policy calls for it (low ML confidence, sampling, or "deep_analysis": true).
+    Accepts JSON: { "text": "...", "deep_analysis": false }
     Returns:  { "label": "REAL|FAKE", "confidence": 92.3, "request_id": "...", ... }
     """
     start_time = time.time()
@@ -188,6 +309,7 @@ def predict_endpoint():
         data = request.get_json(silent=True) or {}
         text = data.get('text', '').strip()
     else:
+        data = None
         text = request.form.get('text', '').strip()
 
     # Validate
@@ -196,37 +318,18 @@ def predict_endpoint():
         return api_response({'error': error_msg, 'code': 'INVALID_INPUT'}, 400)
 
     try:
-        # ── Fast ML prediction ──────────────────────────────────────────────
-        result = predict(text)
+        # ── Fast ML prediction (served from the prediction cache on repeats) ─
+        result = predict_cached(text)
         elapsed_ms_ml = round((time.time() - start_time) * 1000, 1)
         result['ml_time_ms'] = elapsed_ms_ml
         result['response_time_ms'] = elapsed_ms_ml
 
-        # ── Kick off Gemini in the background ───────────────────────────────
-        request_id = str(uuid.uuid4())
-        result['request_id'] = request_id
-        result['gemini'] = {'gemini_available': False, 'pending': True}
-
-        with _gemini_cache_lock:
-            _gemini_cache[request_id] = None  # sentinel: in-progress
-
-        # Prune old cache entries (keep last 50)
-        with _gemini_cache_lock:
-            if len(_gemini_cache) > 50:
-                oldest_keys = list(_gemini_cache.keys())[:-50]
-                for k in oldest_keys:
-                    del _gemini_cache[k]
-
-        t = threading.Thread(
-            target=_run_gemini_background,
-            args=(request_id, text, result['label'], result['confidence']),
-            daemon=True
-        )
-        t.start()
+        # ── Kick off Gemini in the background (if the policy escalates) ─────
+        gemini_status = _dispatch_gemini(result, text, _deep_analysis_requested(data))
 
         logger.info(
             f"Fast predict: {result['label']} ({result['confidence']}%) | "
-            f"ML: {elapsed_ms_ml}ms | Gemini running in background ({request_id[:8]})"
+            f"ML: {elapsed_ms_ml}ms | Gemini {gemini_status} ({(result['request_id'] or '-')[:8]})"
         )
         return api_response(result)
 
@@ -239,20 +342,184 @@ def predict_endpoint():
         return api_response({'error': 'An internal server error occurred.', 'code': 'INTERNAL_ERROR'}, 500)
 
 
+@app.route('/api/predict/events', methods=['GET', 'POST'])
+def predict_events():
+    """
+    Single-connection alternative to /api/predict + /api/gemini-result polling.
+    Accepts { "text": "...", "deep_analysis": false } (JSON or form) or query
+    parameters for EventSource clients,
+    and answers with a text/event-stream:
+
+        event: ml       the ML prediction, sent immediately
+        event: gemini   the Gemini analysis when ready; the ML-only stand-in if the
+                        escalation policy skipped it or the queue was full; or
+                        { "gemini_available": false, "pending": false, "state": ... }
+                        if it expired or timed out
+
+    Comment heartbeats are sent every SSE_HEARTBEAT_SECONDS while waiting.
+    """
+    start_time = time.time()
+
+    if not model_is_ready():
+        return api_response({
+            'error': 'Model not trained yet. Please run the training script first.',
+            'code': 'MODEL_NOT_READY'
+        }, 503)
+
+    data = request.get_json(silent=True) if request.is_json else None
+    if data is not None and not isinstance(data, dict):
+        return api_response({'error': 'Request body must be a JSON object.', 'code': 'INVALID_INPUT'}, 400)
+    text = (data or request.values).get('text') or ''
+    if not isinstance(text, str):
+        return api_response({'error': "'text' must be a string.", 'code': 'INVALID_INPUT'}, 400)
+    text = text.strip()
+    valid, error_msg = validate_text(text)
+    if not valid:
+        return api_response({'error': error_msg, 'code': 'INVALID_INPUT'}, 400)
+
+    try:
+        result = predict_cached(text)
+    except FileNotFoundError as e:
+        return api_response({'error': str(e), 'code': 'MODEL_NOT_FOUND'}, 503)
+    except ValueError as e:
+        return api_response({'error': str(e), 'code': 'PROCESSING_ERROR'}, 400)
+    except Exception as e:
+        logger.exception(f"Unexpected error during prediction: {e}")
+        return api_response({'error': 'An internal server error occurred.', 'code': 'INTERNAL_ERROR'}, 500)
+
+    elapsed_ms_ml = round((time.time() - start_time) * 1000, 1)
+    result['ml_time_ms'] = elapsed_ms_ml
+    result['response_time_ms'] = elapsed_ms_ml
+    waiter = threading.Event()
+    gemini_status = _dispatch_gemini(result, text, _deep_analysis_requested(data), waiter)
+    request_id = result['request_id']
+
+    def generate():
+        try:
+            yield _sse('ml', result)
+            if gemini_status != 'queued':
+                yield _sse('gemini', result['gemini'])
+                return
+            deadline = time.monotonic() + GEMINI_JOB_TIMEOUT
+            while not waiter.wait(min(SSE_HEARTBEAT_SECONDS, max(deadline - time.monotonic(), 0))):
+                if time.monotonic() >= deadline:
+                    break
+                yield ': keep-alive\n\n'
+            state, gemini = _gemini_results.get(request_id)
+            if state == READY:
+                yield _sse('gemini', gemini)
+            else:
+                yield _sse('gemini', {'gemini_available': False, 'pending': False, 'state': state})
+        finally:
+            with _gemini_waiters_lock:
+                _gemini_waiters.pop(request_id, None)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',   # stop nginx from buffering the stream
+    })
+
+
 @app.route('/api/gemini-result/<request_id>', methods=['GET'])
 def get_gemini_result(request_id: str):
     """
     Poll endpoint for background Gemini analysis result.
-    Returns { "ready": false } while pending, or { "ready": true, "gemini": {...} } when done.
+    Returns { "ready": false } while pending, or { "ready": true, "gemini": {...} } when done;
+    410 once the result expired or the job timed out, 404 for unknown ids.
     """
-    with _gemini_cache_lock:
-        if request_id not in _gemini_cache:
-            return api_response({'ready': False, 'error': 'Unknown request_id'}, 404)
-        result = _gemini_cache[request_id]
-
-    if result is None:
+    state, result = _gemini_results.get(request_id)
+    if state == PENDING:
         return api_response({'ready': False})
-    return api_response({'ready': True, 'gemini': result})
+    if state == READY:
+        return api_response({'ready': True, 'gemini': result})
+    if state == EXPIRED:
+        return api_response({'ready': False, 'error': 'Result expired', 'code': 'RESULT_EXPIRED'}, 410)
+    return api_response({'ready': False, 'error': 'Unknown request_id'}, 404)
+
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch_endpoint():
+    """
+    Batch prediction endpoint — ML only unless Gemini analysis is requested.
+    Accepts JSON: { "texts": ["...", "..."] } or a bare JSON array of strings.
+    Returns:  { "results": [ {...}, {"error": "...", "code": "INVALID_INPUT"}, ... ], ... }
+    Results keep the input order; invalid items report their own error.
+
+    With { "texts": [...], "deep_analysis": true } every scored item also gets a
+    request_id, and Gemini analyses them in batches of GEMINI_BATCH_SIZE articles
+    per upstream call; poll /api/gemini-result/<request_id> for each.
+    """
+    start_time = time.time()
+
+    if not model_is_ready():
+        return api_response({
+            'error': 'Model not trained yet. Please run the training script first.',
+            'code': 'MODEL_NOT_READY'
+        }, 503)
+
+    data = request.get_json(silent=True)
+    texts = data.get('texts') if isinstance(data, dict) else data
+    if not isinstance(texts, list) or not texts:
+        return api_response({
+            'error': 'Request body must be a non-empty JSON array of texts or {"texts": [...]}.',
+            'code': 'INVALID_INPUT'
+        }, 400)
+    if len(texts) > MAX_BATCH_SIZE:
+        return api_response({
+            'error': f"Batch exceeds maximum size of {MAX_BATCH_SIZE} texts.",
+            'code': 'BATCH_TOO_LARGE'
+        }, 400)
+
+    results = [None] * len(texts)
+    valid_idx = []
+    for i, text in enumerate(texts):
+        if not isinstance(text, str):
+            results[i] = {'error': 'Each item must be a string.', 'code': 'INVALID_INPUT'}
+            continue
+        valid, error_msg = validate_text(text)
+        if valid:
+            valid_idx.append(i)
+        else:
+            results[i] = {'error': error_msg, 'code': 'INVALID_INPUT'}
+
+    gemini_queued = None
+    try:
+        if valid_idx:
+            predictions = predict_batch([texts[i].strip() for i in valid_idx])
+            for i, item in zip(valid_idx, predictions):
+                if 'error' in item:
+                    item['code'] = 'PROCESSING_ERROR'
+                results[i] = item
+            if isinstance(data, dict) and _deep_analysis_requested(data):
+                scored = [i for i in valid_idx if 'error' not in results[i]]
+                gemini_queued = _dispatch_gemini_batch(
+                    [results[i] for i in scored], [texts[i].strip() for i in scored]
+                )
+    except FileNotFoundError as e:
+        return api_response({'error': str(e), 'code': 'MODEL_NOT_FOUND'}, 503)
+    except Exception as e:
+        logger.exception(f"Unexpected error during batch prediction: {e}")
+        return api_response({'error': 'An internal server error occurred.', 'code': 'INTERNAL_ERROR'}, 500)
+
+    for i, item in enumerate(results):
+        item['index'] = i
+
+    elapsed_ms = round((time.time() - start_time) * 1000, 1)
+    n_ok = sum(1 for r in results if 'error' not in r)
+    logger.info(
+        f"Batch predict: {n_ok}/{len(results)} scored | {elapsed_ms}ms"
+        + (f" | Gemini queued {gemini_queued}" if gemini_queued is not None else "")
+    )
+    response = {
+        'results': results,
+        'count': len(results),
+        'succeeded': n_ok,
+        'failed': len(results) - n_ok,
+        'response_time_ms': elapsed_ms
+    }
+    if gemini_queued is not None:
+        response['gemini_queued'] = gemini_queued
+    return api_response(response)
 
 
 @app.route('/api/predict/file', methods=['POST'])
@@ -291,13 +558,17 @@ def predict_file():
         if not valid:
             return api_response({'error': error_msg, 'code': 'INVALID_INPUT'}, 400)
 
-        result = predict(content)
-        # Also run Gemini analysis on file content
-        try:
-            gemini_result = analyze_with_gemini(content, result['label'], result['confidence'])
-            result['gemini'] = gemini_result
-        except Exception:
-            result['gemini'] = {'gemini_available': False}
+        result = predict_cached(content)
+        # Also run Gemini analysis on file content, if the escalation policy calls for it
+        escalate, _ = should_escalate(result['confidence'], _deep_analysis_requested(None))
+        if not escalate:
+            result['gemini'] = skipped_analysis(result['label'], result['confidence'])
+        else:
+            try:
+                gemini_result = analyze_with_gemini(content, result['label'], result['confidence'])
+                result['gemini'] = gemini_result
+            except Exception:
+                result['gemini'] = {'gemini_available': False}
         return api_response(result)
 
     except Exception as e:
@@ -322,10 +593,41 @@ def system_status():
     return api_response({
         'model_ready': ready,
         'gemini_available': gemini_is_available(),
+        'inference_timings_ms': get_stage_timings(),
+        'prediction_cache': get_cache_stats(),
+        'gemini_executor': _gemini_executor.stats(),
+        'gemini_results': _gemini_results.stats(),
+        'gemini': get_gemini_stats(),
         'version': '1.0.0'
     })
 
 
+@app.route('/api/model/reload', methods=['POST'])
+def model_reload():
+    """
+    Reload model artifacts from disk in this worker right away (e.g. after
+    retraining) and invalidate its prediction cache. Every worker also picks up
+    new artifacts by itself within MODEL_CHECK_INTERVAL seconds.
+
+    Requires "Authorization: Bearer <ADMIN_TOKEN>"; answers 404 while no
+    ADMIN_TOKEN is configured.
+    """
+    if not ADMIN_TOKEN:
+        abort(404)
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {ADMIN_TOKEN}'.encode()):
+        return api_response({'error': 'Missing or invalid admin token.', 'code': 'UNAUTHORIZED'}, 401)
+
+    try:
+        version = reload_model()
+    except FileNotFoundError as e:
+        return api_response({'error': str(e), 'code': 'MODEL_NOT_FOUND'}, 503)
+    except Exception as e:
+        logger.exception(f"Model reload failed: {e}")
+        return api_response({'error': 'Failed to reload model.', 'code': 'RELOAD_ERROR'}, 500)
+    return api_response({'reloaded': True, 'model_version': version})
+
+
 # ─────────────────────────────────────────────
 # Error Handlers
 # ─────────────────────────────────────────────
@@ -358,7 +660,9 @@ if __name__ == '__main__':
     if model_is_ready():
         try:
             from predictor import _load_artifacts
+            from preprocessor import load_resources
             _load_artifacts()
+            load_resources()
             logger.info("Model pre-warmed and ready.")
         except Exception as e:
             logger.warning(f"Model pre-warm failed: {e}")
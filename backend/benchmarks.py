@@ -0,0 +1,472 @@
+"""
+Micro-benchmarks for the AI-Based Fake News Detection System.
+Run from the backend directory:  python benchmarks.py
+"""
+
+import os
+import re
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import preprocessor
+
+SAMPLE_ARTICLE = (
+    "BREAKING!!! <b>Scientists</b> at MIT (see https://example.com/study?id=42) "
+    "published findings in Nature showing a direct link between sleep quality "
+    "and cognitive function... Experts say it's \"huge\" -- read more at www.news.example. "
+)
+
+
+def _legacy_remove_punctuation(text: str) -> str:
+    """Reference copy of the original four-pass cleaner, for comparison."""
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r"[^a-z0-9\s']", ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+def _sample_tokens(n: int = 1000) -> list:
+    """Preprocessed token lists for a small synthetic corpus."""
+    from generate_dataset import generate_dataset
+    df = generate_dataset(n_real=n // 2, n_fake=n // 2)
+    return preprocessor.preprocess_batch(df['text'].tolist(), as_tokens=True)
+
+
+def _report(name: str, fn, number: int) -> float:
+    best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {name:<32} {best * 1e6:10.1f} µs/call")
+    return best
+
+
+def bench_clean(words: int = 5000, number: int = 50):
+    """Compare the fused cleaner against the legacy chained re.sub calls."""
+    n_repeats = max(1, words // len(SAMPLE_ARTICLE.split()))
+    ascii_text = (SAMPLE_ARTICLE * n_repeats).lower()
+    # Typical wire copy: curly quotes and em-dashes throughout
+    unicode_text = ascii_text.replace('"', '\u201c').replace("it's", 'it\u2019s').replace('--', '\u2014')
+
+    for label, text in (('ASCII', ascii_text), ('non-ASCII', unicode_text)):
+        assert preprocessor._remove_punctuation(text) == _legacy_remove_punctuation(text)
+        print(f"Text cleaning, {label} (~{words} words):")
+        legacy = _report('legacy (4x re.sub)', lambda: _legacy_remove_punctuation(text), number)
+        fused = _report('fused', lambda: preprocessor._remove_punctuation(text), number)
+        print(f"  speedup: {legacy / fused:.2f}x")
+
+
+def bench_vectorize(number: int = 200):
+    """Per-request TF-IDF transform: legacy string analyzer vs fused NgramAnalyzer."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from features import NgramAnalyzer
+    from config import TFIDF_NGRAM_RANGE
+
+    docs = _sample_tokens()
+    train = docs[:-60]
+    params = dict(sublinear_tf=True, min_df=2)
+    legacy = TfidfVectorizer(ngram_range=TFIDF_NGRAM_RANGE, **params)
+    legacy.fit([' '.join(d) for d in train])
+    fused = TfidfVectorizer(analyzer=NgramAnalyzer(TFIDF_NGRAM_RANGE), **params).fit(train)
+
+    # A headline-sized document and an article-sized one
+    for doc in (docs[-1], [t for d in docs[-60:] for t in d]):
+        assert (legacy.transform([' '.join(doc)]) != fused.transform([doc])).nnz == 0
+        runs = max(1, number * 40 // len(doc))
+        print(f"Vectorize one document ({len(doc)} tokens, {len(fused.vocabulary_)} features):")
+        before = _report('legacy (join + re-tokenize)', lambda: legacy.transform([' '.join(doc)]), runs)
+        after = _report('fused analyzer', lambda: fused.transform([doc]), runs)
+        print(f"  speedup: {before / after:.2f}x")
+
+
+def bench_compiled(number: int = 500):
+    """Parity and per-request latency: joblib sklearn artifacts vs the compiled NumPy artifact."""
+    import tempfile
+    import joblib
+    import numpy as np
+    from compiled_model import compile_model, load_compiled, save_compiled
+    from config import MODEL_PATH, VECTORIZER_PATH
+
+    # Compiled fresh from the joblib artifacts into a scratch directory: benchmarks
+    # never write serving artifacts (COMPILED_MODEL_PATH takes priority when loading)
+    model, vectorizer = joblib.load(MODEL_PATH), joblib.load(VECTORIZER_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'compiled_model')
+        save_compiled(compile_model(model, vectorizer), path)
+        compiled_model, compiled_vectorizer = load_compiled(path, mmap=False)
+
+    docs = _sample_tokens()
+    strings = [' '.join(d) for d in docs]
+    expected = model.predict_proba(vectorizer.transform(strings))
+    actual = compiled_model.predict_proba(compiled_vectorizer.transform(docs))
+    max_diff = np.abs(expected - actual).max()
+    assert max_diff < 1e-8 and (expected.argmax(axis=1) == actual.argmax(axis=1)).all()
+
+    doc, string = docs[0], strings[0]
+    print(f"Vectorize + score one document (parity on {len(docs)} docs, max |Δp| = {max_diff:.1e}):")
+    before = _report('sklearn (joblib)', lambda: model.predict_proba(vectorizer.transform([string])), number)
+    after = _report('compiled (NumPy)', lambda: compiled_model.predict_proba(compiled_vectorizer.transform([doc])), number)
+    print(f"  speedup: {before / after:.2f}x")
+
+
+def bench_batch(n_texts: int = 1000):
+    """
+    predict() in a loop vs one predict_batch() call, end to end and for the
+    stages batching changes (vectorize, score, explain) on preprocessed tokens.
+    """
+    import predictor
+    from generate_dataset import generate_dataset
+
+    df = generate_dataset(n_real=n_texts // 2, n_fake=n_texts // 2)
+    texts = df['text'].tolist()
+    tokens = preprocessor.preprocess_batch(texts, as_tokens=True)
+    predictor._load_artifacts()
+
+    def timed(fn) -> float:
+        return min(timeit.repeat(fn, number=1, repeat=3))
+
+    print(f"Batch prediction, {len(texts)} texts (per item):")
+    rows = (
+        ('end to end', lambda: [predictor.predict(t) for t in texts], lambda: predictor.predict_batch(texts)),
+        ('model stages only', lambda: [predictor._predict_tokens([t]) for t in tokens],
+         lambda: predictor._predict_tokens(tokens)),
+    )
+    for label, loop, batch in rows:
+        before, after = timed(loop) / len(texts), timed(batch) / len(texts)
+        print(f"  {label:<18} loop {before * 1e6:8.1f} µs   batch {after * 1e6:8.1f} µs   "
+              f"speedup {before / after:.2f}x")
+
+
+def _peak_rss_worker(load, docs, queue):
+    model, vectorizer, docs = load(docs)
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')  # reset the VmHWM peak to the current RSS
+    before = _proc_status_kb()
+    start = time.perf_counter()
+    model.predict_proba(vectorizer.transform(docs))
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, _proc_status_kb()['VmHWM'] - before['VmRSS']))
+
+
+def _proc_status_kb() -> dict:
+    with open('/proc/self/status') as f:
+        return {line.split(':')[0]: int(line.split()[1]) for line in f if line.startswith('Vm')}
+
+
+def _load_sklearn(docs):
+    import joblib
+    from config import MODEL_PATH, VECTORIZER_PATH
+    from features import NgramAnalyzer
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    if not isinstance(vectorizer.analyzer, NgramAnalyzer):
+        docs = [' '.join(d) for d in docs]
+    return joblib.load(MODEL_PATH), vectorizer, docs
+
+
+def _load_compiled(docs):
+    import tempfile
+    import joblib
+    from compiled_model import compile_model, load_compiled, save_compiled
+    from config import MODEL_PATH, VECTORIZER_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'compiled_model')
+        save_compiled(compile_model(joblib.load(MODEL_PATH), joblib.load(VECTORIZER_PATH)), path)
+        model, vectorizer = load_compiled(path, mmap=False)
+    return model, vectorizer, docs
+
+
+def bench_long_documents(n_docs: int = 300, tokens_per_doc: int = 2500):
+    """
+    Peak RSS added and latency of vectorize + score for one batch of long
+    documents: sklearn (joblib) vs the compiled artifact. Each run uses a
+    fresh child process, and the peak is read from /proc (Linux only).
+    """
+    import random
+    import multiprocessing as mp
+
+    if not os.path.exists('/proc/self/clear_refs'):
+        print("Long-document memory report needs Linux /proc; skipped.")
+        return
+
+    pool = [t for d in _sample_tokens() for t in d]
+    rng = random.Random(0)
+    docs = [[rng.choice(pool) for _ in range(tokens_per_doc)] for _ in range(n_docs)]
+
+    ctx = mp.get_context('fork')
+    print(f"Vectorize + score {n_docs} documents of {tokens_per_doc} tokens in one call:")
+    for label, load in (('sklearn (joblib)', _load_sklearn), ('compiled (NumPy)', _load_compiled)):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_peak_rss_worker, args=(load, docs, queue))
+        proc.start()
+        elapsed, peak_kb = queue.get()
+        proc.join()
+        print(f"  {label:<20} {elapsed:8.3f} s   peak RSS +{peak_kb / 1024:7.1f} MB")
+
+
+def _synthetic_terms(n: int) -> list:
+    """n distinct unigram/bigram terms, shaped like a fitted TF-IDF vocabulary."""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    words = sorted({''.join(rng.choice(letters, rng.integers(3, 11))) for _ in range(n)})
+    terms = set(words[:n // 2])
+    while len(terms) < n:
+        a, b = rng.choice(len(words), 2)
+        terms.add(f'{words[a]} {words[b]}')
+    return sorted(terms)
+
+
+def bench_vocabulary(n_features: int = 50000, batch: int = 100):
+    """Vocabulary lookup structure: Python dict (as pickled in the vectorizer) vs TermIndex."""
+    import pickle
+    import tempfile
+    import tracemalloc
+    import numpy as np
+    from features import TermIndex
+
+    terms = _synthetic_terms(n_features)
+    vocabulary = {term: i for i, term in enumerate(terms)}
+    pickled = pickle.dumps(vocabulary, protocol=pickle.HIGHEST_PROTOCOL)
+    rng = np.random.default_rng(1)
+    queries = [terms[i] for i in rng.integers(0, n_features, batch // 2)]
+    queries += [f'{t}x' for t in queries]  # misses
+    index = TermIndex.build(terms)
+    assert index.lookup(queries).tolist() == [vocabulary.get(q, -1) for q in queries]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for key, value in index.to_arrays().items():
+            np.save(os.path.join(tmp, f'{key}.npy'), value)
+        on_disk = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+
+        def load_index():
+            return TermIndex.from_arrays({
+                f[:-4]: np.load(os.path.join(tmp, f), mmap_mode='r') for f in os.listdir(tmp)
+            })
+
+        print(f"Vocabulary of {n_features} terms (pickled dict {len(pickled) // 1024} kB, "
+              f"index files {on_disk // 1024} kB):")
+        for name, load in (('dict', lambda: pickle.loads(pickled)), ('TermIndex (mmap)', load_index)):
+            tracemalloc.start()
+            loaded = load()
+            heap = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del loaded
+            load_s = min(timeit.repeat(load, number=1, repeat=5))
+            print(f"  {name:<18} load {load_s * 1e3:7.2f} ms   private heap {heap // 1024:6} kB")
+
+        mapped = load_index()
+        print(f"Lookup of {batch} terms (50% hits):")
+        before = _report('dict', lambda: [vocabulary.get(q, -1) for q in queries], 2000)
+        after = _report('TermIndex (mmap)', lambda: mapped.lookup(queries), 2000)
+        print(f"  throughput: dict {batch / before / 1e6:.1f} M terms/s, "
+              f"TermIndex {batch / after / 1e6:.1f} M terms/s")
+
+
+def bench_prompt_budget(n_articles: int = 50, parts: int = 15, token_budget: int = 375):
+    """
+    Gemini prompt context for long articles: first-N-characters cut vs salient sentences.
+    Coverage is the share of the article's keyword salience (TF-IDF x |coef|) that
+    survives into the prompt.
+    """
+    import numpy as np
+    import predictor
+    from generate_dataset import generate_dataset
+
+    df = generate_dataset(n_real=n_articles * parts // 2, n_fake=n_articles * parts // 2)
+    rng = np.random.default_rng(0)
+    articles = []
+    for label in df['label'].unique():
+        texts = df.loc[df['label'] == label, 'text'].tolist()
+        for _ in range(n_articles // 2):
+            articles.append(' '.join(rng.choice(texts, parts, replace=False)))
+
+    def salience(text):
+        artifacts = predictor._get_artifacts()
+        features = predictor._vectorize(artifacts.vectorizer, [preprocessor.preprocess_tokens(text)])
+        weights = features.data * artifacts.keyword_coefs[features.indices]
+        return dict(zip(features.indices.tolist(), weights.tolist()))
+
+    limit = token_budget * 4
+    results = {'first chars': [], 'salient': []}
+    lengths = {'first chars': [], 'salient': []}
+    times = []
+    for article in articles:
+        full = salience(article)
+        t0 = time.perf_counter()
+        salient = predictor.select_salient_text(article, token_budget)
+        times.append(time.perf_counter() - t0)
+        for name, context in (('first chars', article[:limit]), ('salient', salient)):
+            kept = salience(context)
+            results[name].append(sum(w for f, w in full.items() if f in kept) / sum(full.values()))
+            lengths[name].append(len(context))
+
+    print(f"Prompt context for {len(articles)} long articles (~{int(np.mean([len(a) for a in articles]))} chars, "
+          f"budget {token_budget} tokens):")
+    for name in results:
+        print(f"  {name:<14} {np.mean(lengths[name]):7.0f} chars   keyword-salience coverage {np.mean(results[name]):.1%}")
+    print(f"  compression time {np.median(times) * 1e3:.2f} ms/article (median)")
+
+
+def bench_gemini_executor(n_jobs: int = 200, worker_counts=(2, 8, 32), latency_ms: float = 50,
+                          error_rate: float = 0.05, malformed_rate: float = 0.05):
+    """
+    Background Gemini throughput against the in-process LLM stub (lognormal latency,
+    injected errors and malformed JSON) for several executor sizes. The analysis
+    cache is bypassed and every article is distinct, so each job is an upstream call.
+    """
+    import logging
+    import threading
+    import numpy as np
+    import gemini_analyzer
+    from executor import BoundedExecutor
+    from llm_stub import StubLLM
+
+    gemini_analyzer._analysis_cache = False  # disabled
+    logging.getLogger('gemini_analyzer').setLevel(logging.CRITICAL)  # injected failures are expected
+    print(f"Gemini jobs via stub ({n_jobs} jobs, lognormal median {latency_ms:.0f} ms, "
+          f"{error_rate:.0%} errors, {malformed_rate:.0%} malformed):")
+    for workers in worker_counts:
+        gemini_analyzer.set_llm_client(StubLLM('lognormal', latency_ms, 0.5, error_rate, malformed_rate, seed=0))
+        executor = BoundedExecutor(workers, n_jobs, name='bench')
+        latencies, fallbacks, done = [], [], threading.Semaphore(0)
+
+        def job(i):
+            t0 = time.perf_counter()
+            result = gemini_analyzer.analyze_with_gemini(f"{SAMPLE_ARTICLE} Article {i}.", 'FAKE', 70)
+            latencies.append(time.perf_counter() - t0)
+            fallbacks.append(not result['gemini_available'])
+            done.release()
+
+        t0 = time.perf_counter()
+        for i in range(n_jobs):
+            executor.submit(job, i)
+        for _ in range(n_jobs):
+            done.acquire()
+        elapsed = time.perf_counter() - t0
+        executor.shutdown()
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1e3
+        print(f"  {workers:>3} workers  {n_jobs / elapsed:7.1f} jobs/s   p50 {p50:6.1f} ms  p95 {p95:6.1f} ms   "
+              f"fallback {np.mean(fallbacks):.1%}")
+    gemini_analyzer.set_llm_client(None)
+
+
+def bench_gemini_hedging(n_calls: int = 400, concurrency: int = 8, latency_ms: float = 40, sigma: float = 1.0):
+    """
+    Tail latency of upstream calls against a heavy-tailed stub (lognormal), with
+    and without a hedged second attempt after the observed p95.
+    """
+    import numpy as np
+    from concurrent.futures import ThreadPoolExecutor
+    from llm_stub import StubLLM
+    from resilience import HedgedCaller
+
+    print(f"Upstream calls via stub ({n_calls} calls, {concurrency} concurrent, "
+          f"lognormal median {latency_ms:.0f} ms, sigma {sigma}):")
+    for hedge in (False, True):
+        stub = StubLLM('lognormal', latency_ms, sigma, seed=0)
+        caller = HedgedCaller(4 * concurrency, timeout=10, hedge=hedge, hedge_delay=latency_ms * 3 / 1000)
+
+        def timed_call(_):
+            t0 = time.perf_counter()
+            caller.call(stub.generate, 'ML Model Prediction: FAKE (Confidence: 70%)')
+            return time.perf_counter() - t0
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = np.array(list(pool.map(timed_call, range(n_calls)))) * 1e3
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        stats = caller.stats()
+        label = 'hedged after p95' if hedge else 'single attempt'
+        print(f"  {label:<17} p50 {p50:6.1f} ms  p95 {p95:6.1f} ms  p99 {p99:6.1f} ms   "
+              f"extra calls {stats['hedged'] / n_calls:.1%} (won {stats['hedge_wins']})")
+
+
+def _memory_kb() -> dict:
+    """RSS / PSS / private memory (kB) of this process, from /proc (Linux only)."""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def _memory_worker(path, mmap, barrier, queue):
+    from compiled_model import load_compiled
+    barrier.wait()  # all workers forked
+    baseline = _memory_kb()
+    model, _ = load_compiled(path, mmap=mmap)
+    # Touch every weight page, as scoring across many requests would
+    float(model.weights.sum() + model.coef_.sum())
+    barrier.wait()  # all workers loaded: PSS now reflects the sharing
+    usage = _memory_kb()
+    queue.put({k: usage[k] - baseline[k] for k in usage})
+
+
+def bench_memory(workers: int = 4, n_features: int = 50000, members: int = 5):
+    """
+    Per-worker memory of a compiled artifact loaded with and without mmap.
+    Uses a synthetic artifact the size of a full SVM model (TFIDF_MAX_FEATURES x 5 folds).
+    """
+    import tempfile
+    import multiprocessing as mp
+    import numpy as np
+    from compiled_model import save_compiled, FORMAT_VERSION
+    from features import TermIndex
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("Memory report needs Linux /proc; skipped.")
+        return
+
+    rng = np.random.default_rng(0)
+    artifact = {
+        'format_version': np.array(FORMAT_VERSION),
+        **TermIndex.build(_synthetic_terms(n_features)).to_arrays(),
+        'idf': rng.random(n_features) + 1,
+        'ngram_range': np.array((1, 2)),
+        'sublinear_tf': np.array(True),
+        'l2_norm': np.array(True),
+        'classes': np.array([0, 1]),
+        'weights': rng.standard_normal((n_features, members)),
+        'intercepts': np.zeros(members),
+        'cal_a': -np.ones(members),
+        'cal_c': np.zeros(members),
+        'explain_coef': rng.random(n_features),
+    }
+
+    ctx = mp.get_context('fork')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'compiled_model')
+        save_compiled(artifact, path)
+        print(f"Compiled artifact memory, {workers} workers ({n_features} features x {members} members), "
+              f"kB per worker added by loading:")
+        for mmap in (False, True):
+            queue, barrier = ctx.Queue(), ctx.Barrier(workers)
+            procs = [ctx.Process(target=_memory_worker, args=(path, mmap, barrier, queue))
+                     for _ in range(workers)]
+            for p in procs:
+                p.start()
+            stats = [queue.get() for _ in procs]
+            for p in procs:
+                p.join()
+            avg = {k: sum(s[k] for s in stats) // workers for k in stats[0]}
+            label = 'mmap' if mmap else 'private copy'
+            print(f"  {label:<14} RSS {avg['rss']:>8}  PSS {avg['pss']:>8}  private {avg['private']:>8}")
+
+
+if __name__ == '__main__':
+    bench_clean()
+    bench_vectorize()
+    bench_compiled()
+    bench_batch()
+    bench_vocabulary()
+    bench_long_documents()
+    bench_prompt_budget()
+    bench_gemini_executor()
+    bench_gemini_hedging()
+    bench_memory()
@@ -0,0 +1,177 @@
+"""
+Caching Utilities for AI-Based Fake News Detection System.
+  - TTLCache:    thread-safe in-memory LRU cache with per-entry TTL, for one process.
+  - SQLiteCache: persistent cache shared by all processes on a host.
+Both keep hit/miss counters for monitoring.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded mapping that evicts the least recently used entry when full and
+    treats entries older than `ttl` seconds as absent.
+
+    Lookups, inserts and evictions are O(1): the OrderedDict keeps entries in
+    recency order, so the LRU entry is always at the front.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        """
+        Args:
+            maxsize: Maximum number of entries; 0 disables caching.
+            ttl: Seconds an entry stays valid after it is stored; 0 means no expiry.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self.maxsize = max(0, int(maxsize))
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key, default=None):
+        """Return the cached value for key and mark it recently used, or default."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and self._expired(entry):
+                del self._data[key]
+                self._counters['expirations'] += 1
+                entry = _MISSING
+            if entry is _MISSING:
+                self._counters['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry if full."""
+        if self.maxsize == 0:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        """Drop every entry (e.g. after the model changes)."""
+        with self._lock:
+            self._data.clear()
+            self._counters['invalidations'] += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> dict:
+        """Counters and occupancy for monitoring."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._data)
+        lookups = stats['hits'] + stats['misses']
+        stats['maxsize'] = self.maxsize
+        stats['ttl_seconds'] = self.ttl
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+        return stats
+
+    def _expired(self, entry) -> bool:
+        return entry[0] is not None and entry[0] <= self._clock()
+
+
+class SQLiteCache:
+    """
+    Persistent key -> JSON value cache in a SQLite file (WAL mode), shared by
+    every process on the host and surviving restarts.
+
+    Entries expire `ttl` seconds after they are stored. Beyond `maxsize`
+    entries the oldest are dropped; expired and excess rows are swept every
+    few hundred writes, so a write stays O(log n). Hit/miss counters are kept
+    per process.
+    """
+
+    _SWEEP_EVERY = 200  # writes between sweeps
+
+    def __init__(self, path: str, maxsize: int, ttl: float, clock=time.time):
+        self.path = path
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread, reopened after a fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key: str):
+        """Return the cached value for key, or None if absent or expired."""
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, self._clock())
+        ).fetchone()
+        with self._lock:
+            self._counters['hits' if row else 'misses'] += 1
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value):
+        """Store a JSON-serializable value under key."""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), self._clock() + self.ttl)
+            )
+        with self._lock:
+            self._counters['stores'] += 1
+            self._writes += 1
+            sweep = self._writes % self._SWEEP_EVERY == 0
+        if sweep:
+            self._sweep()
+
+    def _sweep(self):
+        """Delete expired rows, then the soonest-expiring (oldest) rows beyond maxsize."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (self._clock(),))
+            conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                " SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,)
+            )
+
+    def stats(self) -> dict:
+        size = self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'size': size,
+            'maxsize': self.maxsize,
+            'ttl_seconds': self.ttl,
+            'hit_rate': round(stats['hits'] / lookups, 4) if lookups else None,
+        })
+        return stats
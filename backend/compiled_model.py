@@ -0,0 +1,275 @@
+"""
+Compiled Model Artifact for AI-Based Fake News Detection System.
+Reduces the fitted TF-IDF vectorizer and the winning linear classifier to plain
+NumPy arrays, and scores them without importing scikit-learn (FR-7.x).
+
+At inference every supported model is a sparse dot product per member, a bias
+and a sigmoid calibration, averaged over members:
+
+    p(FAKE) = mean_k  1 / (1 + exp(a_k * (x . w_k + b_k) + c_k))
+
+Logistic Regression and Naive Bayes compile to one member with a = -1, c = 0;
+CalibratedClassifierCV(LinearSVC) compiles to one member per calibrated fold.
+The vocabulary is stored as a features.TermIndex rather than a pickled dict.
+"""
+
+import os
+import shutil
+import logging
+from collections import Counter
+import numpy as np
+
+from features import NgramAnalyzer, TermIndex
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+_DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+# ─────────────────────────────────────────────
+# Export (needs the fitted sklearn objects)
+# ─────────────────────────────────────────────
+
+def compile_model(model, vectorizer) -> dict:
+    """
+    Compile a fitted vectorizer + binary linear classifier to NumPy arrays.
+
+    Raises:
+        ValueError: if the vectorizer configuration or model type is not supported.
+    """
+    ngram_range = _ngram_range(vectorizer)
+    weights, intercepts, cal_a, cal_c, explain_coef = _linear_members(model)
+    terms = vectorizer.get_feature_names_out()
+    if vectorizer.use_idf:
+        idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+    else:
+        idf = np.ones(len(terms), dtype=np.float64)
+
+    return {
+        'format_version': np.array(FORMAT_VERSION),
+        **TermIndex.build(terms).to_arrays(),  # vocab_keys, vocab_hashes, ...
+        'idf': idf,
+        'ngram_range': np.array(ngram_range),
+        'sublinear_tf': np.array(bool(vectorizer.sublinear_tf)),
+        'l2_norm': np.array(vectorizer.norm == 'l2'),
+        'classes': np.asarray(model.classes_),
+        'weights': weights,              # (n_features, n_members)
+        'intercepts': intercepts,        # (n_members,)
+        'cal_a': cal_a,
+        'cal_c': cal_c,
+        'explain_coef': explain_coef,    # empty when keywords use TF-IDF only
+    }
+
+
+def save_compiled(artifact: dict, path: str):
+    """
+    Write a compiled artifact as a directory of raw .npy files (no pickled
+    objects), one per array, so each can be memory-mapped on load.
+    """
+    remove_compiled(path)
+    os.makedirs(path)
+    for key, value in artifact.items():
+        np.save(os.path.join(path, f'{key}.npy'), value, allow_pickle=False)
+
+
+def remove_compiled(path: str):
+    """Delete a compiled artifact directory if it exists."""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+
+
+def _ngram_range(vectorizer) -> tuple:
+    """N-gram range of a vectorizer whose analysis NgramAnalyzer reproduces."""
+    if isinstance(vectorizer.analyzer, NgramAnalyzer):
+        ngram_range = vectorizer.analyzer.ngram_range
+    elif (vectorizer.analyzer == 'word' and vectorizer.tokenizer is None
+          and vectorizer.preprocessor is None and vectorizer.stop_words is None
+          and vectorizer.token_pattern == _DEFAULT_TOKEN_PATTERN and vectorizer.lowercase):
+        # Legacy vectorizer fitted on space-joined preprocess() output
+        ngram_range = vectorizer.ngram_range
+    else:
+        raise ValueError("Vectorizer analyzer configuration cannot be compiled.")
+    if vectorizer.binary or vectorizer.norm not in ('l2', None):
+        raise ValueError("Only binary=False and norm='l2'/None vectorizers can be compiled.")
+    return tuple(ngram_range)
+
+
+def _linear_members(model):
+    """(weights, intercepts, cal_a, cal_c, explain_coef) for a supported binary model."""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.calibration import CalibratedClassifierCV
+
+    if len(model.classes_) != 2:
+        raise ValueError("Only binary classifiers can be compiled.")
+
+    if isinstance(model, LogisticRegression):
+        coef = model.coef_[0]
+        members = [(coef, model.intercept_[0], -1.0, 0.0)]
+        explain_coef = np.abs(coef)
+    elif isinstance(model, MultinomialNB):
+        # log P(FAKE|x) - log P(REAL|x) is linear in x
+        coef = model.feature_log_prob_[1] - model.feature_log_prob_[0]
+        intercept = model.class_log_prior_[1] - model.class_log_prior_[0]
+        members = [(coef, intercept, -1.0, 0.0)]
+        explain_coef = np.empty(0)
+    elif isinstance(model, CalibratedClassifierCV) and model.method == 'sigmoid':
+        members = []
+        for calibrated in model.calibrated_classifiers_:
+            estimator, calibrator = calibrated.estimator, calibrated.calibrators[0]
+            if not hasattr(estimator, 'coef_'):
+                raise ValueError("Calibrated base estimator is not linear.")
+            members.append((estimator.coef_[0], estimator.intercept_[0], calibrator.a_, calibrator.b_))
+        explain_coef = np.abs(model.calibrated_classifiers_[0].estimator.coef_[0])
+    else:
+        raise ValueError(f"{type(model).__name__} cannot be compiled.")
+
+    weights = np.column_stack([m[0] for m in members]).astype(np.float64)
+    return (
+        np.ascontiguousarray(weights),
+        np.array([m[1] for m in members], dtype=np.float64),
+        np.array([m[2] for m in members], dtype=np.float64),
+        np.array([m[3] for m in members], dtype=np.float64),
+        np.asarray(explain_coef, dtype=np.float64),
+    )
+
+
+# ─────────────────────────────────────────────
+# Inference (NumPy only)
+# ─────────────────────────────────────────────
+
+class SparseRows:
+    """Minimal CSR container (indptr/indices/data), as consumed by the predictor."""
+
+    def __init__(self, indptr, indices, data, n_features):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = (len(indptr) - 1, n_features)
+
+
+class CompiledVectorizer:
+    """TF-IDF transform over preprocessed token lists, matching TfidfVectorizer."""
+
+    def __init__(self, artifact):
+        self.term_index = TermIndex.from_arrays(artifact)
+        self.idf_ = artifact['idf']
+        self.sublinear_tf = bool(artifact['sublinear_tf'])
+        self.l2_norm = bool(artifact['l2_norm'])
+        # Candidate n-grams are filtered by vectorized index lookups, in bounded chunks
+        self.analyzer = NgramAnalyzer(tuple(artifact['ngram_range']))
+
+    def get_feature_names_out(self) -> TermIndex:
+        # Indexable like sklearn's array of names, without materialising every term
+        return self.term_index
+
+    # Distinct n-grams per index lookup: bounds the temporary arrays whatever the batch size
+    LOOKUP_CHUNK = 1 << 15
+
+    def transform(self, token_lists) -> SparseRows:
+        n_rows, n_features = len(token_lists), len(self.term_index)
+        rows, cols, counts = [], [], []
+        grams, gram_counts, lengths, first_row = [], [], [], 0
+        for row, tokens in enumerate(token_lists):
+            # Count within the document first, so each distinct n-gram is looked up once
+            doc_counts = Counter(self.analyzer(tokens))
+            grams.extend(doc_counts)
+            gram_counts.extend(doc_counts.values())
+            lengths.append(len(doc_counts))
+            if len(grams) >= self.LOOKUP_CHUNK or row == n_rows - 1:
+                ids = self._lookup(grams)
+                found = ids >= 0
+                rows.append(np.repeat(np.arange(first_row, row + 1, dtype=np.int64), lengths)[found])
+                cols.append(ids[found])
+                counts.append(np.array(gram_counts, dtype=np.float64)[found])
+                grams, gram_counts, lengths, first_row = [], [], [], row + 1
+
+        if rows:
+            rows, cols, values = np.concatenate(rows), np.concatenate(cols), np.concatenate(counts)
+            order = np.argsort(rows * n_features + cols)
+            rows, cols, values = rows[order], cols[order], values[order]
+        else:
+            rows = cols = np.zeros(0, dtype=np.int64)
+            values = np.zeros(0, dtype=np.float64)
+
+        if self.sublinear_tf:
+            values = np.log(values) + 1
+        values *= self.idf_[cols]
+        if self.l2_norm and values.size:
+            norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_rows))
+            values /= norms[rows]
+        indptr = np.searchsorted(rows, np.arange(n_rows + 1, dtype=np.int64))
+        return SparseRows(indptr, cols, values, n_features)
+
+    def _lookup(self, grams: list):
+        """term_index.lookup() in LOOKUP_CHUNK slices (one long document can exceed it)."""
+        if len(grams) <= self.LOOKUP_CHUNK:
+            return self.term_index.lookup(grams)
+        return np.concatenate([
+            self.term_index.lookup(grams[start:start + self.LOOKUP_CHUNK])
+            for start in range(0, len(grams), self.LOOKUP_CHUNK)
+        ])
+
+
+class CompiledClassifier:
+    """Averaged, sigmoid-calibrated linear members (see module docstring)."""
+
+    def __init__(self, artifact):
+        self.classes_ = artifact['classes']
+        self.weights = artifact['weights']
+        self.intercepts = artifact['intercepts']
+        self.cal_a = artifact['cal_a']
+        self.cal_c = artifact['cal_c']
+        if artifact['explain_coef'].size:
+            # Read by predictor._keyword_weights(), like a linear model's coef_
+            self.coef_ = artifact['explain_coef']
+
+    def decision_members(self, X: SparseRows) -> np.ndarray:
+        """Per-member margins x . w_k + b_k, shape (n_rows, n_members)."""
+        n_rows = X.shape[0]
+        out = np.tile(self.intercepts, (n_rows, 1))
+        nonempty = np.diff(X.indptr) > 0
+        if nonempty.any():
+            contrib = self.weights[X.indices] * X.data[:, None]
+            out[nonempty] += np.add.reduceat(contrib, X.indptr[:-1][nonempty], axis=0)
+        return out
+
+    def predict_proba(self, X: SparseRows) -> np.ndarray:
+        margins = self.decision_members(X)
+        p_fake = (1 / (1 + np.exp(self.cal_a * margins + self.cal_c))).mean(axis=1)
+        return np.column_stack([1 - p_fake, p_fake])
+
+    def predict(self, X: SparseRows) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def load_compiled(path: str, mmap: bool = True):
+    """
+    Load a compiled artifact. Returns (model, vectorizer).
+
+    With mmap=True the arrays are memory-mapped read-only: every worker process
+    shares the same page-cache pages instead of holding a private copy.
+    """
+    mmap_mode = 'r' if mmap else None
+    artifact = {
+        name[:-len('.npy')]: np.load(os.path.join(path, name), mmap_mode=mmap_mode, allow_pickle=False)
+        for name in os.listdir(path)
+        if name.endswith('.npy')
+    }
+    if int(artifact['format_version']) != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled model format in {path}")
+    return CompiledClassifier(artifact), CompiledVectorizer(artifact)
+
+
+if __name__ == '__main__':
+    # Compile the existing joblib artifacts without retraining
+    import joblib
+    from config import MODEL_PATH, VECTORIZER_PATH, COMPILED_MODEL_PATH
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    save_compiled(
+        compile_model(joblib.load(MODEL_PATH), joblib.load(VECTORIZER_PATH)),
+        COMPILED_MODEL_PATH
+    )
+    print(f"✅ Compiled model saved to: {COMPILED_MODEL_PATH}")
@@ -9,28 +9,126 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, 'models')
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
+CACHE_DIR = os.path.join(BASE_DIR, 'cache')
 
 # Ensure directories exist
-for d in [MODEL_DIR, DATA_DIR, LOGS_DIR]:
+for d in [MODEL_DIR, DATA_DIR, LOGS_DIR, CACHE_DIR]:
     os.makedirs(d, exist_ok=True)
 
+# NLTK data, provisioned once at build/deploy time by setup_nltk.py
+NLTK_DATA_DIR = os.environ.get('NLTK_DATA_DIR', os.path.join(BASE_DIR, 'nltk_data'))
+
 # Model settings
 MODEL_PATH = os.path.join(MODEL_DIR, 'best_model.joblib')
 VECTORIZER_PATH = os.path.join(MODEL_DIR, 'tfidf_vectorizer.joblib')
 METRICS_PATH = os.path.join(MODEL_DIR, 'model_metrics.json')
+LEMMA_TABLE_PATH = os.path.join(MODEL_DIR, 'lemma_table.joblib')
+COMPILED_MODEL_PATH = os.path.join(MODEL_DIR, 'compiled_model')  # directory of .npy files
+
+# Use the exported lemma table at inference instead of loading WordNet
+USE_LEMMA_TABLE = os.environ.get('USE_LEMMA_TABLE', 'True') == 'True'
+# Serve from the sklearn-free compiled artifact when it exists
+USE_COMPILED_MODEL = os.environ.get('USE_COMPILED_MODEL', 'True') == 'True'
+# Memory-map model arrays read-only so all server workers share one copy
+MMAP_ARTIFACTS = os.environ.get('MMAP_ARTIFACTS', 'True') == 'True'
+# Seconds between checks for retrained artifacts on disk, done by every worker (0 = never)
+MODEL_CHECK_INTERVAL = float(os.environ.get('MODEL_CHECK_INTERVAL', 10))
 
 # TF-IDF settings
 TFIDF_MAX_FEATURES = 50000
 TFIDF_NGRAM_RANGE = (1, 2)  # Unigrams + bigrams
 
+# Preprocessing — worker processes for bulk jobs (-1 = all cores) and texts per task
+PREPROCESS_N_JOBS = int(os.environ.get('PREPROCESS_N_JOBS', -1))
+PREPROCESS_CHUNK_SIZE = int(os.environ.get('PREPROCESS_CHUNK_SIZE', 500))
+# Serving: predict_batch() preprocessing processes per server worker (1 = serial, no pool).
+# Above 1, each worker starts one long-lived pool at worker start (see gunicorn.conf.py)
+# and uses it for batches of at least PREDICT_BATCH_PARALLEL_MIN texts.
+PREDICT_BATCH_N_JOBS = int(os.environ.get('PREDICT_BATCH_N_JOBS', 1))
+PREDICT_BATCH_PARALLEL_MIN = int(os.environ.get('PREDICT_BATCH_PARALLEL_MIN', 256))
+
 # Input validation
 MIN_INPUT_CHARS = 20
 MAX_INPUT_WORDS = 5000
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 1000))  # Texts per /api/predict/batch call
+
+# Prediction cache — repeated submissions of the same text skip the model (size 0 disables)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+PREDICTION_CACHE_TTL = int(os.environ.get('PREDICTION_CACHE_TTL', 3600))  # seconds
+
+# Gemini background analysis — worker threads, and jobs allowed to wait for one
+# (when both are full, /api/predict returns the ML-only result)
+GEMINI_MAX_WORKERS = int(os.environ.get('GEMINI_MAX_WORKERS', 8))
+GEMINI_MAX_QUEUE = int(os.environ.get('GEMINI_MAX_QUEUE', 100))
+
+# Gemini results awaiting /api/gemini-result polls: finished results kept, for how
+# long, and how long a queued or running job may stay pending
+GEMINI_RESULT_CAPACITY = int(os.environ.get('GEMINI_RESULT_CAPACITY', 10000))
+GEMINI_RESULT_TTL = int(os.environ.get('GEMINI_RESULT_TTL', 600))      # seconds
+GEMINI_JOB_TIMEOUT = int(os.environ.get('GEMINI_JOB_TIMEOUT', 120))    # seconds
+
+# Where those results live, so a poll can land on any worker: 'sqlite' (all workers
+# on one host, WAL mode), 'redis' (workers on several hosts) or 'memory' (one process)
+GEMINI_RESULT_STORE = os.environ.get('GEMINI_RESULT_STORE', 'sqlite')
+GEMINI_RESULT_DB_PATH = os.environ.get('GEMINI_RESULT_DB_PATH', os.path.join(CACHE_DIR, 'gemini_results.db'))
+GEMINI_RESULT_REDIS_URL = os.environ.get('GEMINI_RESULT_REDIS_URL', 'redis://localhost:6379/0')
+
+# Gemini escalation policy — only predictions the ML model is unsure about (confidence
+# below the threshold, 0-100) go to Gemini, plus a random sample of the rest and any
+# request sent with "deep_analysis": true
+GEMINI_ESCALATION_THRESHOLD = float(os.environ.get('GEMINI_ESCALATION_THRESHOLD', 90))
+GEMINI_SAMPLE_RATE = float(os.environ.get('GEMINI_SAMPLE_RATE', 0.05))
+
+# Article context sent to Gemini: most salient sentences within this many tokens
+GEMINI_PROMPT_TOKEN_BUDGET = int(os.environ.get('GEMINI_PROMPT_TOKEN_BUDGET', 375))
+
+# Batched analysis (/api/predict/batch): articles per Gemini call, and how many
+# times items missing from a batch answer are resent before falling back
+GEMINI_BATCH_SIZE = int(os.environ.get('GEMINI_BATCH_SIZE', 8))
+GEMINI_BATCH_RETRIES = int(os.environ.get('GEMINI_BATCH_RETRIES', 1))
+
+# LLM backend for Gemini analyses: 'google' (Gemini API), 'http' (a service speaking
+# the llm_stub protocol at GEMINI_STUB_URL) or 'stub' (in-process llm_stub.StubLLM)
+GEMINI_CLIENT = os.environ.get('GEMINI_CLIENT', 'google')
+GEMINI_STUB_URL = os.environ.get('GEMINI_STUB_URL', 'http://127.0.0.1:5055')
+
+# Upstream call resilience: deadline per LLM call; optional hedged second attempt once
+# the first outlives the observed p95 latency (GEMINI_HEDGE_DELAY until enough calls
+# were seen); circuit breaker that fails fast to the ML-only result after
+# consecutive errors and sends probe calls again after the reset timeout
+GEMINI_CALL_TIMEOUT = float(os.environ.get('GEMINI_CALL_TIMEOUT', 30))       # seconds
+GEMINI_HEDGE = os.environ.get('GEMINI_HEDGE', 'False') == 'True'
+GEMINI_HEDGE_DELAY = float(os.environ.get('GEMINI_HEDGE_DELAY', 5))          # seconds
+GEMINI_BREAKER_FAILURES = int(os.environ.get('GEMINI_BREAKER_FAILURES', 5))
+GEMINI_BREAKER_RESET = float(os.environ.get('GEMINI_BREAKER_RESET', 30))     # seconds
+GEMINI_BREAKER_PROBES = int(os.environ.get('GEMINI_BREAKER_PROBES', 1))
+
+# Local LLM stub (python llm_stub.py) for offline load tests: latency distribution
+# ('fixed', 'uniform', 'exponential' or 'lognormal') with its mean/median in ms and
+# spread (relative half-width for uniform, sigma for lognormal), plus the share of
+# calls that fail or return malformed JSON
+LLM_STUB_PORT = int(os.environ.get('LLM_STUB_PORT', 5055))
+LLM_STUB_LATENCY = os.environ.get('LLM_STUB_LATENCY', 'lognormal')
+LLM_STUB_LATENCY_MS = float(os.environ.get('LLM_STUB_LATENCY_MS', 800))
+LLM_STUB_LATENCY_SPREAD = float(os.environ.get('LLM_STUB_LATENCY_SPREAD', 0.5))
+LLM_STUB_ERROR_RATE = float(os.environ.get('LLM_STUB_ERROR_RATE', 0.0))
+LLM_STUB_MALFORMED_RATE = float(os.environ.get('LLM_STUB_MALFORMED_RATE', 0.0))
+LLM_STUB_SEED = int(os.environ['LLM_STUB_SEED']) if os.environ.get('LLM_STUB_SEED') else None
+
+# Persistent cache of Gemini analyses keyed by prompt content (size 0 disables)
+GEMINI_CACHE_SIZE = int(os.environ.get('GEMINI_CACHE_SIZE', 50000))
+GEMINI_CACHE_TTL = int(os.environ.get('GEMINI_CACHE_TTL', 7 * 24 * 3600))  # seconds
+GEMINI_CACHE_PATH = os.environ.get('GEMINI_CACHE_PATH', os.path.join(CACHE_DIR, 'gemini_cache.db'))
+
+# /api/predict/events — keep-alive comment interval while waiting for Gemini
+SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))
 
 # Flask settings — DEBUG=False prevents the reloader from killing long Gemini requests
 DEBUG = os.environ.get('FLASK_DEBUG', 'False') == 'True'
 PORT = int(os.environ.get('PORT', 5000))
 HOST = os.environ.get('HOST', '0.0.0.0')
+# Bearer token for POST /api/model/reload; the endpoint is disabled while unset
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
 
 # Data split ratios
 TRAIN_RATIO = 0.70
@@ -0,0 +1,156 @@
+"""
+Background Work Executor for AI-Based Fake News Detection System.
+  - BoundedExecutor: a fixed-size thread pool with a bounded queue, so bursts of
+    requests apply backpressure instead of creating one blocked thread per request.
+  - SingleFlight: coalesces concurrent identical calls into one execution.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedExecutor:
+    """
+    Runs at most `max_workers` jobs at once and holds at most `max_queue` more.
+    submit() never blocks: when every slot is taken the job is rejected and
+    the caller decides how to degrade.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, name: str = 'worker'):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0   # queued + running
+        self._active = 0      # running
+        self._counters = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+
+    def submit(self, fn, *args, **kwargs) -> bool:
+        """
+        Queue fn(*args, **kwargs) for a worker thread.
+
+        Returns:
+            True if the job was accepted, False if the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters['rejected'] += 1
+            return False
+        with self._lock:
+            self._in_flight += 1
+            self._counters['submitted'] += 1
+        try:
+            self._pool.submit(self._run, fn, args, kwargs)
+        except RuntimeError:
+            # Pool already shut down (interpreter exit)
+            self._release(running=False)
+            with self._lock:
+                self._counters['rejected'] += 1
+            return False
+        return True
+
+    def _run(self, fn, args, kwargs):
+        with self._lock:
+            self._active += 1
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            logger.exception(f"Background job {getattr(fn, '__name__', fn)} failed: {e}")
+            with self._lock:
+                self._counters['failed'] += 1
+        finally:
+            self._release(running=True)
+
+    def _release(self, running: bool):
+        with self._lock:
+            self._in_flight -= 1
+            if running:
+                self._active -= 1
+                self._counters['completed'] += 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        """Queue depth, active workers and job counters for monitoring."""
+        with self._lock:
+            return {
+                'queue_depth': self._in_flight - self._active,
+                'active_workers': self._active,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                **self._counters,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the
+    function, callers arriving while it runs wait for and share its result.
+    """
+
+    def __init__(self, timeout: float = None):
+        """
+        Args:
+            timeout: Seconds a waiting caller waits for the running call before
+                     giving up with TimeoutError (None waits indefinitely).
+        """
+        self.timeout = timeout
+        self._calls = {}   # key -> _Call in progress
+        self._lock = threading.Lock()
+        self._counters = {'executed': 0, 'deduplicated': 0}
+
+    def do(self, key, fn, *args, **kwargs) -> tuple:
+        """
+        Run fn(*args, **kwargs) unless a call with the same key is already running.
+
+        Returns:
+            (result, shared): shared is True when the result came from another caller's call.
+
+        Raises:
+            TimeoutError: if waiting on another caller's call took longer than `timeout`.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters['executed'] += 1
+            else:
+                self._counters['deduplicated'] += 1
+
+        if not leader:
+            if not call.done.wait(self.timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight call {key!r}")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'in_flight': len(self._calls), **self._counters}
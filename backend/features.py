@@ -0,0 +1,177 @@
+"""
+Feature Extraction Helpers for AI-Based Fake News Detection System.
+Implements FR-4.x: TF-IDF n-gram features built directly from preprocessed tokens,
+and a compact vocabulary index for the compiled model.
+"""
+
+import re
+
+import numpy as np
+
+# sklearn's default token_pattern; applied per token so the fused analyzer yields
+# exactly the terms TfidfVectorizer would extract from the space-joined text.
+_TERM_RE = re.compile(r'(?u)\b\w\w+\b')
+
+
+class NgramAnalyzer:
+    """
+    TfidfVectorizer analyzer that takes preprocess_tokens() output straight to
+    n-gram features, without re-joining and re-tokenizing the text.
+
+    Every candidate n-gram is emitted: the vectorizer already looks each one up
+    in its vocabulary, so filtering here would hash the kept terms twice.
+    """
+
+    def __init__(self, ngram_range=(1, 2)):
+        self.ngram_range = tuple(ngram_range)
+
+    def __getstate__(self):
+        # Artifacts pickled by earlier versions may carry extra state; keep only this
+        return {'ngram_range': self.ngram_range}
+
+    def __setstate__(self, state):
+        self.__init__(state['ngram_range'])
+
+    def __call__(self, tokens) -> list:
+        if isinstance(tokens, str):
+            tokens = tokens.split()
+
+        # Preprocessed tokens are normally already terms; only re-split the rare
+        # ones with apostrophes, single characters or other non-word characters.
+        if ''.join(tokens).isalnum() and min(map(len, tokens)) > 1:
+            terms = tokens
+        else:
+            terms = []
+            for tok in tokens:
+                if len(tok) > 1 and tok.isalnum():
+                    terms.append(tok)
+                else:
+                    terms.extend(_TERM_RE.findall(tok))
+
+        min_n, max_n = self.ngram_range
+        features = []
+        for n in range(min_n, max_n + 1):
+            if n == 1:
+                features.extend(terms)
+            else:
+                features.extend(map(' '.join, zip(*(terms[k:] for k in range(n)))))
+        return features
+
+
+class TermIndex:
+    """
+    Compact term -> feature index stored as flat NumPy buffers, used in place of
+    a fitted vectorizer's vocabulary_ dict.
+
+    Terms are kept as a fixed-width UTF-8 byte array in feature order. A lookup
+    hashes a whole batch of query strings at once (a vectorized multiply-add over
+    their bytes), finds candidates through a bucket table over the sorted hashes
+    and confirms each hit against the stored bytes, so a hash collision can never
+    return a wrong feature. Every array can be memory-mapped, so no per-term
+    Python objects are created when a worker loads the model.
+    """
+
+    _FIELDS = ('keys', 'hashes', 'order', 'buckets', 'multipliers')
+
+    def __init__(self, keys, hashes, order, buckets, multipliers):
+        # Plain ndarray views: np.memmap indexing adds Python-level overhead per call
+        keys, hashes, order, buckets, multipliers = map(
+            np.asarray, (keys, hashes, order, buckets, multipliers))
+        self.keys = keys                  # 'S<width>', one per feature, in feature order
+        self.hashes = hashes              # uint64, sorted, all distinct
+        self.order = order                # feature index of each sorted hash
+        self.buckets = buckets            # hashes[buckets[b]:buckets[b + 1]] share their top bits b
+        self.multipliers = multipliers    # uint64 per byte position, width + 1 of them
+        self._shift = np.uint64(64 - (len(buckets) - 1).bit_length() + 1)
+
+    @classmethod
+    def build(cls, terms, seed: int = 0):
+        """Build an index for terms, where terms[i] is feature i."""
+        keys = np.array([term.encode('utf-8') for term in terms], dtype=bytes)
+        if keys.size == 0:
+            keys = keys.astype('S1')
+        n_buckets = 2 << max(len(keys) - 1, 1).bit_length()  # load factor <= 1/2
+        shift = np.uint64(64 - n_buckets.bit_length() + 1)
+        rng = np.random.default_rng(seed)
+        while True:
+            multipliers = rng.integers(1, 2 ** 63, size=keys.dtype.itemsize + 1, dtype=np.uint64)
+            hashes = _hash_keys(keys, multipliers)
+            order = np.argsort(hashes, kind='stable')
+            hashes = hashes[order]
+            if not (hashes[1:] == hashes[:-1]).any():
+                break
+        buckets = np.searchsorted(hashes >> shift, np.arange(n_buckets + 1, dtype=np.uint64))
+        return cls(keys, hashes, order.astype(np.int64), buckets.astype(np.int64), multipliers)
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, prefix: str = 'vocab_'):
+        return cls(*(arrays[prefix + name] for name in cls._FIELDS))
+
+    def to_arrays(self, prefix: str = 'vocab_') -> dict:
+        return {prefix + name: getattr(self, name) for name in self._FIELDS}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, i) -> str:
+        return self.keys[i].decode('utf-8')
+
+    def __contains__(self, term) -> bool:
+        return bool(self.lookup([term])[0] >= 0)
+
+    def lookup(self, terms):
+        """
+        Feature index of each term, or -1 where the term is not in the vocabulary.
+
+        Temporary memory is a small multiple of the query array (one fixed-width
+        row per term), so callers with large inputs should dedupe terms and look
+        them up in bounded chunks (see CompiledVectorizer.transform).
+        """
+        ids = np.full(len(terms), -1, dtype=np.int64)
+        if len(terms) == 0 or len(self.keys) == 0:
+            return ids
+        # One byte wider than any key, so an over-long term cannot be truncated into a match
+        width = f'S{len(self.multipliers)}'
+        try:
+            queries = np.array(terms, dtype=width)  # preprocessed terms are ASCII
+        except UnicodeEncodeError:
+            queries = np.array([term.encode('utf-8') for term in terms], dtype=width)
+        hashes = _hash_keys(queries, self.multipliers)
+
+        # Probe each query's bucket, dropping queries once matched or exhausted
+        bucket = (hashes >> self._shift).astype(np.int64)
+        pending = np.flatnonzero(self.buckets[bucket + 1] > self.buckets[bucket])
+        pos, end = self.buckets[bucket[pending]], self.buckets[bucket[pending] + 1]
+        while pending.size:
+            hit = self.hashes[pos] == hashes[pending]
+            ids[pending[hit]] = self.order[pos[hit]]
+            pos += 1
+            more = ~hit & (pos < end)
+            pending, pos, end = pending[more], pos[more], end[more]
+
+        found = ids >= 0
+        found[found] = self.keys[ids[found]] == queries[found]
+        ids[~found] = -1
+        return ids
+
+
+# Largest (n_keys x width) uint64 matrix _hash_keys() builds (512 kB)
+_HASH_MATRIX_LIMIT = 1 << 16
+
+
+def _hash_keys(keys, multipliers):
+    """
+    64-bit multiply-add hash of each fixed-width byte string (trailing NULs add nothing).
+
+    Small batches take one matrix product. Larger ones are summed one byte column
+    at a time, so their temporaries stay at one uint64 per key instead of an
+    (n_keys x width) uint64 matrix.
+    """
+    width = keys.dtype.itemsize
+    codes = np.ascontiguousarray(keys).view(np.uint8).reshape(len(keys), width)
+    if codes.size <= _HASH_MATRIX_LIMIT:
+        return codes.astype(np.uint64) @ multipliers[:width]
+    hashes = np.zeros(len(keys), dtype=np.uint64)
+    for j in range(width):
+        hashes += codes[:, j] * multipliers[j]
+    return hashes
@@ -2,31 +2,73 @@
 Gemini AI Analysis Module for TruthLens Fake News Detection System.
 Provides deep contextual analysis using Google's Gemini 1.5 Flash model
 as a second-opinion layer alongside the ML classifier.
+
+The model is reached through an LLM client: any object with
+generate(prompt, max_output_tokens=None) -> response text, raising on failure.
+GEMINI_CLIENT picks GoogleGeminiClient (default), HTTPLLMClient or the
+in-process llm_stub.StubLLM; set_llm_client() installs one directly.
+Every call runs under a deadline, optional hedging and a circuit breaker
+(see resilience.py); when the breaker is open analyses fall back at once.
 """
 
 import os
 import logging
 import re
 import json
+import random
+import sqlite3
+import hashlib
+import threading
+import urllib.request
+
+from cache import SQLiteCache
+from executor import SingleFlight
+from resilience import CircuitBreaker, CircuitBreakerOpen, HedgedCaller, OPEN
+from config import (
+    GEMINI_CACHE_SIZE, GEMINI_CACHE_TTL, GEMINI_CACHE_PATH, GEMINI_JOB_TIMEOUT,
+    GEMINI_ESCALATION_THRESHOLD, GEMINI_SAMPLE_RATE, GEMINI_PROMPT_TOKEN_BUDGET,
+    GEMINI_BATCH_SIZE, GEMINI_BATCH_RETRIES, GEMINI_CLIENT, GEMINI_STUB_URL, GEMINI_MAX_WORKERS,
+    GEMINI_CALL_TIMEOUT, GEMINI_HEDGE, GEMINI_HEDGE_DELAY,
+    GEMINI_BREAKER_FAILURES, GEMINI_BREAKER_RESET, GEMINI_BREAKER_PROBES
+)
 
 logger = logging.getLogger(__name__)
 
 # Primary key from environment; fallback to placeholder (user must provide their own key)
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE")
-_gemini_model = None
+_llm_client = None
 _gemini_available = False
 
+# Persistent analysis cache, opened on first use (see _get_analysis_cache)
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()
 
-def _init_gemini():
-    """Lazy-initialize the Gemini client."""
-    global _gemini_model, _gemini_available
-    if _gemini_model is not None:
-        return _gemini_available
-    try:
+# Concurrent analyses of the same prompt share one upstream call
+_gemini_flights = SingleFlight(timeout=GEMINI_JOB_TIMEOUT)
+
+# Escalation decisions by reason (see should_escalate)
+_escalation_counts = {'requested': 0, 'low_confidence': 0, 'sampled': 0, 'confident': 0}
+_escalation_lock = threading.Lock()
+
+# Every upstream call: deadline + optional hedge, behind a circuit breaker (see _generate).
+# Two call threads per Gemini worker leave room for a hedge or an abandoned attempt.
+_upstream = HedgedCaller(2 * GEMINI_MAX_WORKERS, GEMINI_CALL_TIMEOUT, GEMINI_HEDGE, GEMINI_HEDGE_DELAY,
+                         name='gemini-call')
+_breaker = CircuitBreaker(GEMINI_BREAKER_FAILURES, GEMINI_BREAKER_RESET, GEMINI_BREAKER_PROBES)
+
+# Batched analysis counters (see analyze_batch_with_gemini)
+_batch_counts = {'calls': 0, 'items': 0, 'retried': 0, 'failed': 0}
+_batch_lock = threading.Lock()
+
+
+class GoogleGeminiClient:
+    """LLM client for the Gemini API (google-generativeai)."""
+
+    def __init__(self, api_key: str, model_name: str = "gemini-1.5-flash"):
         import google.generativeai as genai
-        genai.configure(api_key=GEMINI_API_KEY)
-        _gemini_model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash",
+        genai.configure(api_key=api_key)
+        self._model = genai.GenerativeModel(
+            model_name=model_name,
             generation_config={
                 "temperature": 0.2,       # Low temperature for factual analysis
                 "top_p": 0.85,
@@ -34,8 +76,56 @@ def _init_gemini():
                 "max_output_tokens": 600, # Concise but thorough
             },
         )
+
+    def generate(self, prompt: str, max_output_tokens: int = None) -> str:
+        kwargs = {'request_options': {'timeout': GEMINI_CALL_TIMEOUT}}
+        if max_output_tokens:
+            kwargs['generation_config'] = {'max_output_tokens': max_output_tokens}
+        return self._model.generate_content(prompt, **kwargs).text
+
+
+class HTTPLLMClient:
+    """LLM client for an HTTP service speaking the llm_stub protocol (POST /generate)."""
+
+    def __init__(self, url: str, timeout: float = GEMINI_CALL_TIMEOUT):
+        self.url = url.rstrip('/') + '/generate'
+        self.timeout = timeout
+
+    def generate(self, prompt: str, max_output_tokens: int = None) -> str:
+        body = json.dumps({'prompt': prompt, 'max_output_tokens': max_output_tokens}).encode('utf-8')
+        req = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read())['text']
+
+
+def _create_llm_client(kind: str):
+    """Build the LLM client named by GEMINI_CLIENT ('google', 'http' or 'stub')."""
+    if kind == 'google':
+        return GoogleGeminiClient(GEMINI_API_KEY)
+    if kind == 'http':
+        return HTTPLLMClient(GEMINI_STUB_URL)
+    if kind == 'stub':
+        from llm_stub import StubLLM
+        return StubLLM.from_config()
+    raise ValueError(f"Unknown Gemini client: {kind!r}")
+
+
+def set_llm_client(client):
+    """Use `client` for all further analyses (None re-initializes from GEMINI_CLIENT)."""
+    global _llm_client, _gemini_available
+    _llm_client = client
+    _gemini_available = client is not None
+
+
+def _init_gemini():
+    """Lazy-initialize the LLM client."""
+    global _llm_client, _gemini_available
+    if _llm_client is not None:
+        return _gemini_available
+    try:
+        _llm_client = _create_llm_client(GEMINI_CLIENT)
         _gemini_available = True
-        logger.info("Gemini AI initialized successfully.")
+        logger.info(f"Gemini AI initialized successfully ({GEMINI_CLIENT} client).")
     except Exception as e:
         logger.warning(f"Gemini AI not available: {e}")
         _gemini_available = False
@@ -43,6 +133,10 @@ def _init_gemini():
 
 
 # ── Prompt template ───────────────────────────────────────────────────────────
+# Part of every analysis cache key: bump it whenever the prompt or the response
+# handling changes, so cached analyses from the old prompt are not served.
+_PROMPT_VERSION = 1
+
 _ANALYSIS_PROMPT = """You are an expert fact-checker and media literacy analyst. 
 Analyze the following news article/headline for credibility indicators.
 
@@ -67,6 +161,36 @@ Be precise, objective, and base your analysis only on the text provided.
 Return ONLY valid JSON, no explanation outside the JSON.
 """
 
+_BATCH_PROMPT = """You are an expert fact-checker and media literacy analyst. 
+Analyze each of the following {count} news articles/headlines for credibility indicators.
+Treat every article independently.
+
+{articles}
+Provide a JSON array with one object per article, each with exactly these fields:
+[
+  {{
+    "id": "<the article's id, copied exactly>",
+    "gemini_verdict": "REAL" or "FAKE" or "UNCERTAIN",
+    "gemini_confidence": <integer 0-100>,
+    "credibility_score": <integer 0-10, where 10 = highly credible>,
+    "red_flags": [<list of up to 5 specific red flags found, or empty list>],
+    "credibility_signals": [<list of up to 5 credibility signals found, or empty list>],
+    "language_analysis": "<1-2 sentences on writing style and tone>",
+    "fact_check_verdict": "<1 concise sentence verdict>",
+    "recommendation": "<1 sentence action recommendation for the reader>"
+  }}
+]
+
+Be precise, objective, and base each analysis only on that article's text.
+Return ONLY valid JSON, no explanation outside the JSON.
+"""
+
+_BATCH_ITEM = """ARTICLE id="{id}"
+ML Model Prediction: {ml_label} (Confidence: {ml_confidence}%)
+\"\"\"{text}\"\"\"
+
+"""
+
 
 def analyze_with_gemini(text: str, ml_label: str, ml_confidence: float) -> dict:
     """
@@ -80,38 +204,263 @@ def analyze_with_gemini(text: str, ml_label: str, ml_confidence: float) -> dict:
     Returns:
         Dict with Gemini analysis fields, or a fallback dict if unavailable.
     """
-    if not _init_gemini():
-        return _fallback_analysis(ml_label, ml_confidence)
+    prompt = _ANALYSIS_PROMPT.format(**_prompt_fields(text, ml_label, ml_confidence))
 
-    # Truncate very long articles for the prompt (keep first 1500 chars)
-    truncated = text[:1500] + ("…" if len(text) > 1500 else "")
-
-    prompt = _ANALYSIS_PROMPT.format(
-        text=truncated,
-        ml_label=ml_label,
-        ml_confidence=int(ml_confidence)
-    )
+    # Identical prompts get the stored analysis without an upstream call
+    cache_key = _analysis_cache_key(prompt)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
 
     try:
-        response = _gemini_model.generate_content(prompt)
-        raw = response.text.strip()
+        result, shared = _gemini_flights.do(
+            cache_key, _analyze_uncached, prompt, cache_key, ml_label, ml_confidence
+        )
+    except TimeoutError as e:
+        logger.warning(f"Gemini analysis error: {e}")
+        return _fallback_analysis(ml_label, ml_confidence)
+    return dict(result) if shared else result
 
-        # Strip markdown code fences if present
-        raw = re.sub(r'^```(?:json)?\s*', '', raw, flags=re.MULTILINE)
-        raw = re.sub(r'\s*```$', '', raw, flags=re.MULTILINE)
-        raw = raw.strip()
 
-        data = json.loads(raw)
-        return _sanitize_gemini_response(data)
+def _analyze_uncached(prompt: str, cache_key: str, ml_label: str, ml_confidence: float) -> dict:
+    """Send one prompt to Gemini and cache the sanitized answer."""
+    if not _init_gemini():
+        return _fallback_analysis(ml_label, ml_confidence)
+
+    try:
+        raw = _generate(prompt)
+        data = json.loads(_strip_code_fences(raw))
+        result = _sanitize_gemini_response(data)
+        _cache_set(cache_key, result)
+        return result
 
+    except CircuitBreakerOpen:
+        return _fallback_analysis(ml_label, ml_confidence)
     except json.JSONDecodeError as e:
         logger.warning(f"Gemini returned non-JSON response: {e}")
-        return _fallback_analysis(ml_label, ml_confidence, raw_text=getattr(response, 'text', ''))
+        return _fallback_analysis(ml_label, ml_confidence, raw_text=raw)
     except Exception as e:
         logger.error(f"Gemini analysis error: {e}")
         return _fallback_analysis(ml_label, ml_confidence)
 
 
+def analyze_batch_with_gemini(items: list) -> list:
+    """
+    Run Gemini analysis on several articles, packing up to GEMINI_BATCH_SIZE of
+    them into each upstream call instead of one call per article.
+
+    Every article in a call carries an id; the JSON array answer is matched back
+    by id, and articles missing from it or malformed are resent (up to
+    GEMINI_BATCH_RETRIES more times) before falling back to the ML-only result.
+    Analyses are cached under the same key as analyze_with_gemini() for that
+    article, so either path reuses the other's results.
+
+    Args:
+        items: List of (text, ml_label, ml_confidence) tuples.
+
+    Returns:
+        One analysis dict per item, in input order.
+    """
+    results = [None] * len(items)
+    pending = {}   # index -> (prompt fields, cache key)
+    for i, (text, ml_label, ml_confidence) in enumerate(items):
+        fields = _prompt_fields(text, ml_label, ml_confidence)
+        cache_key = _analysis_cache_key(_ANALYSIS_PROMPT.format(**fields))
+        results[i] = _cache_get(cache_key)
+        if results[i] is None:
+            pending[i] = (fields, cache_key)
+
+    if pending and _init_gemini():
+        for attempt in range(GEMINI_BATCH_RETRIES + 1):
+            if attempt:
+                with _batch_lock:
+                    _batch_counts['retried'] += len(pending)
+                logger.info(f"Retrying {len(pending)} Gemini batch item(s), attempt {attempt + 1}")
+            indices = list(pending)
+            for start in range(0, len(indices), max(1, GEMINI_BATCH_SIZE)):
+                chunk = indices[start:start + max(1, GEMINI_BATCH_SIZE)]
+                for i, result in _analyze_chunk({i: pending[i][0] for i in chunk}).items():
+                    results[i] = result
+                    _cache_set(pending.pop(i)[1], result)
+            if not pending:
+                break
+
+    if pending:
+        with _batch_lock:
+            _batch_counts['failed'] += len(pending)
+    for i in pending:
+        _, ml_label, ml_confidence = items[i]
+        results[i] = _fallback_analysis(ml_label, ml_confidence)
+    return results
+
+
+def _analyze_chunk(fields_by_index: dict) -> dict:
+    """
+    Send one batched prompt. Returns {index: sanitized analysis} for the
+    articles the answer covered; the rest are left to the caller to retry.
+    """
+    ids = {f'a{n}': i for n, i in enumerate(fields_by_index, 1)}
+    prompt = _BATCH_PROMPT.format(
+        count=len(ids),
+        articles=''.join(_BATCH_ITEM.format(id=item_id, **fields_by_index[i]) for item_id, i in ids.items())
+    )
+    with _batch_lock:
+        _batch_counts['calls'] += 1
+        _batch_counts['items'] += len(ids)
+
+    try:
+        raw = _generate(prompt, max_output_tokens=600 * len(ids))
+        data = json.loads(_strip_code_fences(raw))
+    except CircuitBreakerOpen:
+        return {}
+    except json.JSONDecodeError as e:
+        logger.warning(f"Gemini returned non-JSON batch response: {e}")
+        return {}
+    except Exception as e:
+        logger.error(f"Gemini batch analysis error: {e}")
+        return {}
+
+    if isinstance(data, dict):
+        # Tolerate {"results": [...]} or a bare object for a batch of one
+        data = next((v for v in data.values() if isinstance(v, list)), [data])
+    analyses = {}
+    for entry in data if isinstance(data, list) else []:
+        if not isinstance(entry, dict) or str(entry.get('id')) not in ids:
+            continue
+        try:
+            analyses[ids[str(entry['id'])]] = _sanitize_gemini_response(entry)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Malformed Gemini batch item {entry.get('id')}: {e}")
+    return analyses
+
+
+def _generate(prompt: str, max_output_tokens: int = None) -> str:
+    """
+    One upstream LLM call under GEMINI_CALL_TIMEOUT, hedged if enabled. Errors and
+    timeouts count toward the circuit breaker; a malformed answer does not, since
+    the service did respond.
+
+    Raises:
+        CircuitBreakerOpen: without calling upstream, while the breaker is open.
+        TimeoutError:       if the call missed its deadline.
+    """
+    if not _breaker.allow():
+        raise CircuitBreakerOpen("Gemini circuit breaker is open")
+    try:
+        raw = _upstream.call(_llm_client.generate, prompt, max_output_tokens)
+    except Exception:
+        _breaker.record_failure()
+        raise
+    _breaker.record_success()
+    return raw
+
+
+def _prompt_fields(text: str, ml_label: str, ml_confidence: float) -> dict:
+    """Template fields for one article, shared by the single and batched prompts."""
+    return {'text': _compress_article(text), 'ml_label': ml_label, 'ml_confidence': int(ml_confidence)}
+
+
+def _strip_code_fences(raw: str) -> str:
+    """Strip markdown code fences that Gemini sometimes wraps JSON in."""
+    raw = re.sub(r'^```(?:json)?\s*', '', raw.strip(), flags=re.MULTILINE)
+    raw = re.sub(r'\s*```$', '', raw, flags=re.MULTILINE)
+    return raw.strip()
+
+
+def _compress_article(text: str) -> str:
+    """
+    Article context for the prompt: its most salient sentences within
+    GEMINI_PROMPT_TOKEN_BUDGET, or the leading characters if no model is loaded.
+    """
+    try:
+        from predictor import select_salient_text
+        return select_salient_text(text, GEMINI_PROMPT_TOKEN_BUDGET)
+    except Exception as e:
+        logger.debug(f"Salience compression unavailable, truncating: {e}")
+        limit = GEMINI_PROMPT_TOKEN_BUDGET * 4
+        return text[:limit] + ("…" if len(text) > limit else "")
+
+
+def _get_analysis_cache():
+    """Open the persistent analysis cache on first use; None when disabled or unusable."""
+    global _analysis_cache
+    if _analysis_cache is None and GEMINI_CACHE_SIZE > 0:
+        with _analysis_cache_lock:
+            if _analysis_cache is None:
+                try:
+                    _analysis_cache = SQLiteCache(GEMINI_CACHE_PATH, GEMINI_CACHE_SIZE, GEMINI_CACHE_TTL)
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning(f"Gemini analysis cache disabled: {e}")
+                    _analysis_cache = False
+    return _analysis_cache or None
+
+
+def _analysis_cache_key(prompt: str) -> str:
+    """Hash of the prompt template version and the rendered (truncated) prompt."""
+    return hashlib.sha256(f'{_PROMPT_VERSION}\0{prompt}'.encode('utf-8')).hexdigest()
+
+
+def _cache_get(key: str):
+    cache = _get_analysis_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except sqlite3.Error as e:
+        logger.warning(f"Gemini analysis cache read failed: {e}")
+        return None
+
+
+def _cache_set(key: str, result: dict):
+    cache = _get_analysis_cache()
+    if cache is None:
+        return
+    try:
+        cache.set(key, result)
+    except sqlite3.Error as e:
+        logger.warning(f"Gemini analysis cache write failed: {e}")
+
+
+def should_escalate(ml_confidence: float, requested: bool = False) -> tuple:
+    """
+    Decide whether a prediction is worth a Gemini analysis.
+
+    Args:
+        ml_confidence: ML model confidence (0-100).
+        requested:     The client explicitly asked for deep analysis.
+
+    Returns:
+        (escalate, reason): reason is 'requested', 'low_confidence', 'sampled'
+        (a random share of confident predictions, for quality monitoring) or
+        'confident' when Gemini is skipped.
+    """
+    if requested:
+        reason = 'requested'
+    elif ml_confidence < GEMINI_ESCALATION_THRESHOLD:
+        reason = 'low_confidence'
+    elif random.random() < GEMINI_SAMPLE_RATE:
+        reason = 'sampled'
+    else:
+        reason = 'confident'
+    with _escalation_lock:
+        _escalation_counts[reason] += 1
+    return reason != 'confident', reason
+
+
+def skipped_analysis(ml_label: str, ml_confidence: float) -> dict:
+    """ML-only stand-in for a Gemini analysis that the escalation policy skipped."""
+    result = _fallback_analysis(ml_label, ml_confidence)
+    result.update({
+        'escalated': False,
+        'skip_reason': 'ml_confident',
+        'fact_check_verdict': (
+            f"ML model classified this as {ml_label} with {int(ml_confidence)}% confidence; "
+            "AI deep analysis was not needed."
+        ),
+    })
+    return result
+
+
 def _sanitize_gemini_response(data: dict) -> dict:
     """Ensure all expected fields exist and have correct types."""
     verdict = str(data.get('gemini_verdict', 'UNCERTAIN')).upper()
@@ -148,5 +497,32 @@ def _fallback_analysis(ml_label: str, ml_confidence: float, raw_text: str = '')
 
 
 def gemini_is_available() -> bool:
-    """Check if Gemini client initializes correctly."""
-    return _init_gemini()
+    """Check that the LLM client initializes and its circuit breaker is not open."""
+    return _init_gemini() and _breaker.state != OPEN
+
+
+def get_gemini_stats() -> dict:
+    """Gemini analysis counters for /api/status."""
+    cache = _get_analysis_cache()
+    with _escalation_lock:
+        by_reason = dict(_escalation_counts)
+    with _batch_lock:
+        batch = dict(_batch_counts)
+    decisions = sum(by_reason.values())
+    escalated = decisions - by_reason['confident']
+    return {
+        'analysis_cache': cache.stats() if cache is not None else None,
+        'coalescing': _gemini_flights.stats(),
+        'circuit_breaker': _breaker.stats(),
+        'upstream': _upstream.stats(),
+        'batching': {**batch, 'batch_size': GEMINI_BATCH_SIZE, 'max_retries': GEMINI_BATCH_RETRIES},
+        'escalation': {
+            'decisions': decisions,
+            'escalated': escalated,
+            'skipped': by_reason['confident'],
+            'escalation_rate': round(escalated / decisions, 4) if decisions else None,
+            'by_reason': by_reason,
+            'threshold': GEMINI_ESCALATION_THRESHOLD,
+            'sample_rate': GEMINI_SAMPLE_RATE,
+        },
+    }
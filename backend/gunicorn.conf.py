@@ -0,0 +1,27 @@
+"""
+Gunicorn settings for AI-Based Fake News Detection System.
+Run from the backend directory:  gunicorn app:app
+"""
+
+import os
+import multiprocessing
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+
+# Threaded workers: a client waiting on /api/predict/events holds one cheap thread
+# blocked on an Event, not a whole sync worker process. Set GUNICORN_WORKER_CLASS=gevent
+# (with gevent installed) to hold waiting streams on greenlets instead.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+
+# gthread heartbeats from its main loop, so long-lived streams do not trip this
+timeout = 120
+keepalive = 5
+
+
+def post_worker_init(worker):
+    # Fork the optional predict_batch() preprocessing pool (PREDICT_BATCH_N_JOBS > 1)
+    # once per worker, before its request threads start
+    import predictor
+    predictor.start_batch_pool()
@@ -0,0 +1,205 @@
+"""
+Local LLM Stub for AI-Based Fake News Detection System.
+Stands in for the Gemini API so the two-phase predict flow, the executor,
+caching and timeouts can be load-tested offline and reproducibly.
+
+Answers analysis prompts with canned JSON (one object, or an array for batched
+prompts) after a latency drawn from a configurable distribution, and fails or
+returns malformed JSON for a configurable share of calls.
+
+  - In process:  GEMINI_CLIENT=stub (or gemini_analyzer.set_llm_client(StubLLM(...)))
+  - As a service: python llm_stub.py, then GEMINI_CLIENT=http GEMINI_STUB_URL=http://127.0.0.1:5055
+
+Protocol: POST /generate {"prompt": "...", "max_output_tokens": n}
+          -> 200 {"text": "..."} or 503 {"error": "..."};  GET /stats -> counters.
+Settings come from the LLM_STUB_* values in config.py.
+"""
+
+import re
+import json
+import math
+import time
+import random
+import hashlib
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+_BATCH_ITEM_RE = re.compile(
+    r'ARTICLE id="(?P<id>[^"]+)"\s*\nML Model Prediction: (?P<label>\w+) \(Confidence: (?P<conf>\d+)%\)'
+)
+_SINGLE_RE = re.compile(r'ML Model Prediction: (?P<label>\w+) \(Confidence: (?P<conf>\d+)%\)')
+
+
+class StubLLMError(RuntimeError):
+    """Injected upstream failure."""
+
+
+class StubLLM:
+    """
+    Fake LLM client with the gemini_analyzer client interface:
+    generate(prompt, max_output_tokens=None) -> response text.
+    """
+
+    def __init__(self, latency: str = 'lognormal', latency_ms: float = 800, spread: float = 0.5,
+                 error_rate: float = 0.0, malformed_rate: float = 0.0, seed: int = None,
+                 sleep=time.sleep):
+        """
+        Args:
+            latency:        Distribution name, one of LATENCY_DISTRIBUTIONS.
+            latency_ms:     Mean latency (median for lognormal), in milliseconds.
+            spread:         Relative half-width for 'uniform', sigma for 'lognormal'.
+            error_rate:     Share of calls that raise StubLLMError (0-1).
+            malformed_rate: Share of successful calls that return truncated JSON (0-1).
+            seed:           Seed for reproducible latencies and failures.
+            sleep:          Injectable sleep function (e.g. a no-op for fast tests).
+
+        Raises:
+            ValueError: for an unknown latency distribution.
+        """
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency!r}")
+        self.latency = latency
+        self.latency_ms = max(0.0, float(latency_ms))
+        self.spread = max(0.0, float(spread))
+        self.error_rate = float(error_rate)
+        self.malformed_rate = float(malformed_rate)
+        self._sleep = sleep
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'errors': 0, 'malformed': 0}
+
+    @classmethod
+    def from_config(cls):
+        """Stub configured by the LLM_STUB_* settings."""
+        from config import (
+            LLM_STUB_LATENCY, LLM_STUB_LATENCY_MS, LLM_STUB_LATENCY_SPREAD,
+            LLM_STUB_ERROR_RATE, LLM_STUB_MALFORMED_RATE, LLM_STUB_SEED
+        )
+        return cls(LLM_STUB_LATENCY, LLM_STUB_LATENCY_MS, LLM_STUB_LATENCY_SPREAD,
+                   LLM_STUB_ERROR_RATE, LLM_STUB_MALFORMED_RATE, LLM_STUB_SEED)
+
+    def sample_latency(self) -> float:
+        """Seconds the next call takes."""
+        mean = self.latency_ms / 1000
+        with self._lock:
+            if self.latency == 'fixed':
+                return mean
+            if self.latency == 'uniform':
+                return max(0.0, self._rng.uniform(mean * (1 - self.spread), mean * (1 + self.spread)))
+            if self.latency == 'exponential':
+                return self._rng.expovariate(1 / mean) if mean else 0.0
+            return self._rng.lognormvariate(math.log(mean), self.spread) if mean else 0.0
+
+    def generate(self, prompt: str, max_output_tokens: int = None) -> str:
+        delay = self.sample_latency()
+        with self._lock:
+            self._counters['calls'] += 1
+            fail = self._rng.random() < self.error_rate
+            malformed = not fail and self._rng.random() < self.malformed_rate
+            if fail:
+                self._counters['errors'] += 1
+            elif malformed:
+                self._counters['malformed'] += 1
+        self._sleep(delay)
+        if fail:
+            raise StubLLMError("Injected upstream error")
+
+        text = json.dumps(_canned_response(prompt), indent=2)
+        if malformed:
+            return text[:len(text) // 2]
+        return text
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                'latency': self.latency,
+                'latency_ms': self.latency_ms,
+                'spread': self.spread,
+                'error_rate': self.error_rate,
+                'malformed_rate': self.malformed_rate,
+            }
+
+
+def _canned_response(prompt: str):
+    """An analysis per article in the prompt, agreeing with the ML verdict."""
+    items = [m.groupdict() for m in _BATCH_ITEM_RE.finditer(prompt)]
+    if items:
+        return [{'id': item['id'], **_canned_analysis(prompt, item['label'], int(item['conf']))} for item in items]
+    match = _SINGLE_RE.search(prompt)
+    label, conf = (match['label'], int(match['conf'])) if match else ('UNCERTAIN', 50)
+    return _canned_analysis(prompt, label, conf)
+
+
+def _canned_analysis(prompt: str, label: str, ml_confidence: int) -> dict:
+    # Deterministic per prompt, so repeated runs compare like with like
+    jitter = int(hashlib.md5(prompt.encode('utf-8')).hexdigest()[:4], 16) % 21 - 10
+    is_fake = label == 'FAKE'
+    return {
+        'gemini_verdict': label,
+        'gemini_confidence': min(max(ml_confidence + jitter, 0), 100),
+        'credibility_score': 2 if is_fake else 8,
+        'red_flags': ['Stub: sensational wording'] if is_fake else [],
+        'credibility_signals': [] if is_fake else ['Stub: attributed sources'],
+        'language_analysis': 'Stub analysis of writing style.',
+        'fact_check_verdict': f'Stub verdict: {label}.',
+        'recommendation': 'Stub recommendation: verify with trusted sources.',
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    stub: StubLLM = None
+
+    def do_POST(self):
+        if self.path != '/generate':
+            return self._reply(404, {'error': 'Not found'})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            text = self.stub.generate(body['prompt'], body.get('max_output_tokens'))
+        except StubLLMError as e:
+            return self._reply(503, {'error': str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            return self._reply(400, {'error': f'Bad request: {e}'})
+        self._reply(200, {'text': text})
+
+    def do_GET(self):
+        if self.path != '/stats':
+            return self._reply(404, {'error': 'Not found'})
+        self._reply(200, self.stub.stats())
+
+    def _reply(self, status: int, data: dict):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve(stub: StubLLM, host: str = '127.0.0.1', port: int = 5055) -> ThreadingHTTPServer:
+    """Build a threaded HTTP server for the stub; call serve_forever() on it."""
+    handler = type('StubHandler', (_StubHandler,), {'stub': stub})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == '__main__':
+    from config import LLM_STUB_PORT
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    stub = StubLLM.from_config()
+    server = serve(stub, port=LLM_STUB_PORT)
+    logger.info(f"LLM stub listening on http://127.0.0.1:{LLM_STUB_PORT} ({stub.stats()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -1,43 +1,239 @@
 """
 Prediction Module for AI-Based Fake News Detection System.
-Handles real-time single-article prediction with confidence scoring (FR-7.x).
+Handles real-time single-article and batch prediction with confidence scoring (FR-7.x).
 """
 
 import os
+import re
 import json
+import hashlib
 import logging
+import time
+import threading
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
 import joblib
 import numpy as np
-from preprocessor import preprocess
-from config import MODEL_PATH, VECTORIZER_PATH, METRICS_PATH
+from preprocessor import (
+    preprocess_tokens, preprocess_batch, iter_preprocess, use_lemma_table, iter_chunks,
+    create_process_pool
+)
+from features import NgramAnalyzer
+from compiled_model import load_compiled
+from cache import TTLCache
+from config import (
+    MODEL_PATH, VECTORIZER_PATH, METRICS_PATH, LEMMA_TABLE_PATH, COMPILED_MODEL_PATH,
+    USE_LEMMA_TABLE, USE_COMPILED_MODEL, MMAP_ARTIFACTS, MODEL_CHECK_INTERVAL,
+    PREDICT_BATCH_N_JOBS, PREDICT_BATCH_PARALLEL_MIN,
+    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+)
 
 logger = logging.getLogger(__name__)
 
-_model = None
-_vectorizer = None
-_metrics = None
+
+
+class _Artifacts(NamedTuple):
+    """One consistent set of loaded artifacts, replaced as a whole on reload."""
+    model: object
+    vectorizer: object
+    metrics: dict
+    feature_names: object   # vectorizer vocabulary, for keyword explanations
+    keyword_coefs: object   # |model coefficients| per feature, or None
+    version: str
+
+
+_artifacts = None
+_artifacts_lock = threading.Lock()
+
+# Change detection for artifacts retrained on disk, see _check_for_new_artifacts()
+_next_check = 0.0
+_seen_version = None   # on-disk fingerprint at the previous check
+_check_lock = threading.Lock()
+
+# Preprocessing pool for large predict_batch() calls, see start_batch_pool()
+_batch_pool = None
+
+# Results of predict_cached(), keyed by model version + normalized text
+_prediction_cache = TTLCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+# Rolling per-stage latency samples from predict(), see get_stage_timings()
+STAGE_TIMING_WINDOW = 1000
+_stage_timings = {}
+
+UNPROCESSABLE_MESSAGE = "Text could not be processed. Please provide more meaningful content."
+
+# Sentence boundaries for select_salient_text(); newlines also end a sentence
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?…])\s+|\s*\n\s*')
+_CHARS_PER_TOKEN = 4  # rough LLM tokenizer ratio for English prose
 
 
 def _load_artifacts():
-    """Lazy-load model and vectorizer from disk."""
-    global _model, _vectorizer, _metrics
+    """Lazy-load model and vectorizer from disk. Returns (model, vectorizer, metrics)."""
+    artifacts = _get_artifacts()
+    return artifacts.model, artifacts.vectorizer, artifacts.metrics
+
+
+def _get_artifacts() -> _Artifacts:
+    """
+    The current artifacts, loading them on first use. Callers take one snapshot
+    per request so a concurrent reload_model() never pairs a model with another
+    build's vectorizer.
+    """
+    global _artifacts
+    artifacts = _artifacts
+    if artifacts is None:
+        with _artifacts_lock:
+            if _artifacts is None:
+                loaded, lemma_table = _read_artifacts()
+                _artifacts = loaded
+                if lemma_table is not None:
+                    use_lemma_table(lemma_table)
+            artifacts = _artifacts
+
+    if artifacts.metrics is None and os.path.exists(METRICS_PATH):
+        # Metrics may be written after the model (e.g. by a training run in progress)
+        metrics = _read_metrics()
+        with _artifacts_lock:
+            if _artifacts is artifacts:
+                _artifacts = artifacts._replace(metrics=metrics)
+            artifacts = _artifacts
+
+    if MODEL_CHECK_INTERVAL > 0 and time.monotonic() >= _next_check:
+        _check_for_new_artifacts(artifacts)
+        artifacts = _artifacts
+    return artifacts
+
+
+def _check_for_new_artifacts(current: _Artifacts):
+    """
+    Reload when the artifact files on disk differ from the loaded version. Each
+    worker calls this itself, at most every MODEL_CHECK_INTERVAL seconds, so a
+    retrain reaches all of them without a request to each one. A new fingerprint
+    must be seen unchanged on two consecutive checks before it is loaded, so a
+    training run still writing its files is never picked up half-way.
+    """
+    global _next_check, _seen_version
+    if not _check_lock.acquire(blocking=False):
+        return  # another thread is checking; keep serving the current set
+    try:
+        now = time.monotonic()
+        if now < _next_check:
+            return
+        _next_check = now + MODEL_CHECK_INTERVAL
+        on_disk = _disk_version()
+        settled = on_disk is not None and on_disk == _seen_version
+        _seen_version = on_disk
+        if settled and on_disk != current.version:
+            try:
+                reload_model()
+            except Exception as e:
+                logger.warning(f"Automatic model reload failed, keeping version {current.version}: {e}")
+    finally:
+        _check_lock.release()
+
+
+def _artifact_paths():
+    """
+    The files the next load reads from. Returns (compiled, paths) where compiled
+    tells whether they are the compiled artifact or the joblib model pair.
+    """
+    if USE_COMPILED_MODEL and os.path.exists(COMPILED_MODEL_PATH):
+        compiled = True
+        paths = [os.path.join(COMPILED_MODEL_PATH, name) for name in os.listdir(COMPILED_MODEL_PATH)]
+    else:
+        compiled = False
+        paths = [MODEL_PATH, VECTORIZER_PATH]
+    if USE_LEMMA_TABLE and os.path.exists(LEMMA_TABLE_PATH):
+        # A rebuilt table changes preprocessing, so it is part of the version
+        paths.append(LEMMA_TABLE_PATH)
+    return compiled, paths
+
+
+def _disk_version():
+    """Fingerprint of the artifacts currently on disk, or None while they are incomplete."""
+    try:
+        return _artifact_version(_artifact_paths()[1])
+    except OSError:
+        return None
 
-    if _model is None:
+
+def _read_artifacts():
+    """
+    Load model, vectorizer, metrics and lemma table from disk without touching
+    the module state. Returns (_Artifacts, lemma_table or None).
+    """
+    compiled, paths = _artifact_paths()
+    if compiled:
+        # NumPy-only artifact: scikit-learn is never imported
+        logger.info("Loading compiled model from disk...")
+        version = _artifact_version(paths)
+        model, vectorizer = load_compiled(COMPILED_MODEL_PATH, mmap=MMAP_ARTIFACTS)
+    else:
         if not os.path.exists(MODEL_PATH):
             raise FileNotFoundError(
                 f"No trained model found at {MODEL_PATH}. "
                 "Please run trainer.py to train a model first."
             )
         logger.info("Loading model from disk...")
-        _model = joblib.load(MODEL_PATH)
-        _vectorizer = joblib.load(VECTORIZER_PATH)
-        logger.info("Model and vectorizer loaded successfully.")
+        version = _artifact_version(paths)
+        # mmap_mode shares the numpy arrays in uncompressed joblib files across workers
+        mmap_mode = 'r' if MMAP_ARTIFACTS else None
+        model = joblib.load(MODEL_PATH, mmap_mode=mmap_mode)
+        vectorizer = joblib.load(VECTORIZER_PATH, mmap_mode=mmap_mode)
+    logger.info("Model and vectorizer loaded successfully.")
+
+    lemma_table = None
+    if USE_LEMMA_TABLE and os.path.exists(LEMMA_TABLE_PATH):
+        lemma_table = joblib.load(LEMMA_TABLE_PATH)
+    metrics = _read_metrics() if os.path.exists(METRICS_PATH) else None
+
+    # Explanation lookups, computed once instead of per request
+    artifacts = _Artifacts(
+        model=model,
+        vectorizer=vectorizer,
+        metrics=metrics,
+        feature_names=vectorizer.get_feature_names_out(),
+        keyword_coefs=_keyword_weights(model),
+        version=version,
+    )
+    return artifacts, lemma_table
+
+
+def _read_metrics() -> dict:
+    with open(METRICS_PATH, 'r') as f:
+        return json.load(f)
 
-    if _metrics is None and os.path.exists(METRICS_PATH):
-        with open(METRICS_PATH, 'r') as f:
-            _metrics = json.load(f)
 
-    return _model, _vectorizer, _metrics
+def _artifact_version(paths: list) -> str:
+    """Short fingerprint of the artifact files (name, size, mtime) a model was loaded from."""
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        stat = os.stat(path)
+        digest.update(f'{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return digest.hexdigest()[:12]
+
+
+def reload_model() -> str:
+    """
+    Load the artifacts again from disk (e.g. after retraining) and swap them in.
+
+    Requests keep being served by the old model while the new one loads; the swap
+    itself is a single assignment, so no request sees a half-replaced set. The
+    prediction cache is cleared after the swap. Returns the new model version.
+    """
+    global _artifacts
+    loaded, lemma_table = _read_artifacts()
+    with _artifacts_lock:
+        _artifacts = loaded
+        if lemma_table is not None:
+            use_lemma_table(lemma_table)
+    if lemma_table is not None:
+        # The pool's processes still hold the previous table
+        _stop_batch_pool()
+    _prediction_cache.clear()
+    logger.info(f"Model reloaded (version {loaded.version}); prediction cache cleared.")
+    return loaded.version
 
 
 def predict(text: str) -> dict:
@@ -55,35 +251,226 @@ def predict(text: str) -> dict:
           - model_name: name of the model used
           - model_accuracy: accuracy on held-out test set
     """
-    model, vectorizer, metrics = _load_artifacts()
+    artifacts = _get_artifacts()
+
+    stage_ms = {}
+    t0 = time.perf_counter()
 
     # Preprocess
-    processed = preprocess(text)
-    if not processed.strip():
-        raise ValueError("Text could not be processed. Please provide more meaningful content.")
+    tokens = preprocess_tokens(text)
+    if not tokens:
+        raise ValueError(UNPROCESSABLE_MESSAGE)
+    processed = ' '.join(tokens)
+    t1 = time.perf_counter()
+    stage_ms['preprocess'] = (t1 - t0) * 1000
 
     # Vectorize
-    features = vectorizer.transform([processed])
+    features = _vectorize(artifacts.vectorizer, [tokens])
+    t0 = time.perf_counter()
+    stage_ms['vectorize'] = (t0 - t1) * 1000
 
-    # Predict
-    pred_class = model.predict(features)[0]
-    label = 'FAKE' if pred_class == 1 else 'REAL'
+    # Predict class and confidence from one model evaluation
+    pred_classes, confidences = _score(artifacts.model, features)
+    pred_class, confidence = pred_classes[0], confidences[0]
+    t1 = time.perf_counter()
+    stage_ms['score'] = (t1 - t0) * 1000
+
+    # Top contributing keywords (explainability)
+    top_keywords = _get_top_keywords(artifacts, features)
+    stage_ms['explain'] = (time.perf_counter() - t1) * 1000
+
+    _record_stage_timings(stage_ms)
+    result = _build_result(processed, pred_class, confidence, top_keywords, artifacts.metrics)
+    result['stage_ms'] = {k: round(v, 3) for k, v in stage_ms.items()}
+    return result
+
+
+def predict_cached(text: str) -> dict:
+    """
+    predict() behind the prediction cache.
+
+    The key is a hash of the model version and the text as the preprocessor sees
+    it (lowercased, whitespace collapsed), so trivially different submissions of
+    the same article share one entry and a reloaded model never serves stale results.
+
+    Returns:
+        A fresh copy of the prediction dict, with 'cached': True on a hit. Hits
+        carry no 'stage_ms', since no model stage ran.
+    """
+    version = _get_artifacts().version
+    normalized = ' '.join(text.lower().split())
+    key = hashlib.sha256(f'{version}\0{normalized}'.encode('utf-8')).hexdigest()
+
+    cached = _prediction_cache.get(key)
+    if cached is not None:
+        return {**cached, 'cached': True}
+
+    result = predict(text)
+    _prediction_cache.set(key, {k: v for k, v in result.items() if k != 'stage_ms'})
+    return {**result, 'cached': False}
+
+
+def get_cache_stats() -> dict:
+    """Prediction cache counters (hits, misses, evictions, ...) for this process."""
+    artifacts = _artifacts
+    return {**_prediction_cache.stats(), 'model_version': artifacts.version if artifacts else None}
 
-    # Confidence score
+
+def predict_batch(texts: list) -> list:
+    """
+    Classify many texts in one vectorized pass.
+
+    All texts are preprocessed, stacked into a single sparse matrix and scored
+    with one model call, which avoids paying sklearn's per-call overhead for
+    every item. That saving applies to the vectorize/score/explain stages only:
+    per-text NLTK preprocessing costs the same either way and dominates a batch.
+
+    Preprocessing is serial unless start_batch_pool() created this worker's
+    pool (PREDICT_BATCH_N_JOBS > 1); batches of at least PREDICT_BATCH_PARALLEL_MIN
+    texts are then split over it.
+
+    Args:
+        texts: List of raw input texts.
+
+    Returns:
+        List in input order. Each entry is the same dict returned by predict(),
+        or {'error': ...} for a text that could not be processed.
+    """
+    _load_artifacts()  # installs the lemma table before preprocessing
+    texts = list(texts)
+    pool = _batch_pool
+    tokens = None
+    if pool is not None and len(texts) >= PREDICT_BATCH_PARALLEL_MIN:
+        try:
+            tokens = preprocess_batch(
+                texts, n_jobs=PREDICT_BATCH_N_JOBS, as_tokens=True, executor=pool,
+                chunk_size=-(-len(texts) // PREDICT_BATCH_N_JOBS)
+            )
+        except BrokenProcessPool:
+            logger.exception("Batch preprocessing pool broke; continuing serially.")
+            _stop_batch_pool()
+    if tokens is None:
+        tokens = preprocess_batch(texts, as_tokens=True)
+    return _predict_tokens(tokens)
+
+
+def start_batch_pool():
+    """
+    Start this server worker's long-lived preprocessing pool for predict_batch()
+    when PREDICT_BATCH_N_JOBS > 1. Call once at worker start, before the worker
+    runs any threads (gunicorn.conf.py does this in post_worker_init).
+    """
+    global _batch_pool
+    if PREDICT_BATCH_N_JOBS <= 1 or _batch_pool is not None:
+        return
+    try:
+        _load_artifacts()  # the pool's processes inherit the lemma table
+    except FileNotFoundError as e:
+        logger.warning(f"No batch preprocessing pool: {e}")
+        return
+    _batch_pool = create_process_pool(PREDICT_BATCH_N_JOBS)
+    logger.info(f"Batch preprocessing pool started ({PREDICT_BATCH_N_JOBS} processes).")
+
+
+def _stop_batch_pool():
+    """Retire the pool; later batches preprocess serially."""
+    global _batch_pool
+    pool, _batch_pool = _batch_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def predict_stream(texts, chunk_size: int = 1000, n_jobs: int = 1):
+    """
+    Classify an iterable of texts of any size with bounded memory.
+
+    Texts are preprocessed lazily (optionally across n_jobs worker processes)
+    and vectorized/scored chunk_size at a time, so peak memory does not grow
+    with the input, e.g. predict_stream(trainer.iter_dataset_texts(path)).
+
+    Yields:
+        One dict per input text, in order, as returned by predict_batch().
+    """
+    _load_artifacts()  # installs the lemma table before preprocessing
+    tokens = iter_preprocess(texts, n_jobs=n_jobs, chunk_size=chunk_size, as_tokens=True)
+    for chunk in iter_chunks(tokens, chunk_size):
+        yield from _predict_tokens(chunk)
+
+
+def _predict_tokens(tokens: list) -> list:
+    """Vectorize and score a list of preprocessed token lists (see predict_batch)."""
+    artifacts = _get_artifacts()
+
+    valid_idx = [i for i, t in enumerate(tokens) if t]
+    results = [{'error': UNPROCESSABLE_MESSAGE} for _ in tokens]
+    if not valid_idx:
+        return results
+
+    processed = [' '.join(tokens[i]) for i in valid_idx]
+    features = _vectorize(artifacts.vectorizer, [tokens[i] for i in valid_idx])
+    pred_classes, confidences = _score(artifacts.model, features)
+
+    for row, i in enumerate(valid_idx):
+        top_keywords = _get_top_keywords(artifacts, features, row=row)
+        results[i] = _build_result(
+            processed[row], pred_classes[row], confidences[row], top_keywords, artifacts.metrics
+        )
+    return results
+
+
+def _vectorize(vectorizer, token_lists: list):
+    """TF-IDF features for preprocessed token lists (fused analyzer or legacy string input)."""
+    if isinstance(vectorizer.analyzer, NgramAnalyzer):
+        return vectorizer.transform(token_lists)
+    return vectorizer.transform([' '.join(t) for t in token_lists])
+
+
+def _score(model, features):
+    """
+    Predicted classes and confidences (0-100, one decimal) from a single
+    probability or decision evaluation, instead of predict() followed by
+    predict_proba(), which would score every row twice.
+    """
     if hasattr(model, 'predict_proba'):
-        proba = model.predict_proba(features)[0]
-        confidence = float(proba[pred_class]) * 100
+        proba = model.predict_proba(features)
+        best = proba.argmax(axis=1)
+        pred_classes = model.classes_[best]
+        confidence = proba[np.arange(len(best)), best] * 100
     elif hasattr(model, 'decision_function'):
-        decision = model.decision_function(features)[0]
+        decision = np.atleast_1d(model.decision_function(features))
+        pred_classes = model.classes_[(decision > 0).astype(int)]
         # Sigmoid transform for SVM
-        confidence = float(1 / (1 + np.exp(-abs(decision)))) * 100
+        confidence = 1 / (1 + np.exp(-np.abs(decision))) * 100
     else:
-        confidence = 80.0  # Fallback
+        pred_classes = model.predict(features)
+        confidence = np.full(len(pred_classes), 80.0)  # Fallback
 
-    confidence = round(min(max(confidence, 0.0), 100.0), 1)
+    return pred_classes, [round(min(max(float(c), 0.0), 100.0), 1) for c in confidence]
+
+
+def _record_stage_timings(stage_ms: dict):
+    """Keep a rolling window of per-request stage latencies for get_stage_timings()."""
+    for stage, ms in stage_ms.items():
+        _stage_timings.setdefault(stage, deque(maxlen=STAGE_TIMING_WINDOW)).append(ms)
 
-    # Top contributing keywords (explainability)
-    top_keywords = _get_top_keywords(model, vectorizer, features, pred_class)
+
+def get_stage_timings() -> dict:
+    """p50/p99 latency (ms) of each predict() stage over the recent window."""
+    stats = {}
+    for stage, samples in list(_stage_timings.items()):
+        values = np.array(samples)
+        if values.size:
+            stats[stage] = {
+                'p50': round(float(np.percentile(values, 50)), 3),
+                'p99': round(float(np.percentile(values, 99)), 3),
+                'count': int(values.size),
+            }
+    return stats
+
+
+def _build_result(processed: str, pred_class, confidence: float, top_keywords: list, metrics) -> dict:
+    """Assemble the public prediction dict shared by predict() and predict_batch()."""
+    label = 'FAKE' if pred_class == 1 else 'REAL'
 
     # Model info
     model_name = metrics.get('best_model', 'Ensemble') if metrics else 'ML Classifier'
@@ -101,45 +488,115 @@ def predict(text: str) -> dict:
     }
 
 
-def _get_top_keywords(model, vectorizer, features, pred_class, top_n=10) -> list:
+def _keyword_weights(model):
+    """
+    Absolute per-feature coefficients used to weight keywords, or None when the
+    model has no linear coefficients (keywords are then ranked by TF-IDF alone).
+    """
+    if hasattr(model, 'coef_'):
+        coefs = model.coef_[0] if model.coef_.ndim > 1 else model.coef_
+        return np.abs(coefs)
+    if hasattr(model, 'calibrated_classifiers_'):
+        # CalibratedClassifierCV wrapping LinearSVC
+        base = model.calibrated_classifiers_[0].estimator
+        if hasattr(base, 'coef_'):
+            return np.abs(base.coef_[0])
+    return None
+
+
+def _get_top_keywords(artifacts: _Artifacts, features, row=0, top_n=10) -> list:
     """
     Extract top TF-IDF keywords contributing to the prediction.
     Works for linear models with coef_ attribute.
+    `row` selects the CSR row to explain. Feature names and coefficient weights
+    are precomputed once per load (see _read_artifacts()), and must come from the
+    same `artifacts` the features were vectorized with.
     """
     try:
-        feature_names = vectorizer.get_feature_names_out()
-        nonzero = features.nonzero()[1]
-        tfidf_scores = np.array(features[0, nonzero].toarray())[0]
-
-        # For linear models, use coefficients
-        if hasattr(model, 'coef_'):
-            coefs = model.coef_[0] if model.coef_.ndim > 1 else model.coef_
-            coef_scores = coefs[nonzero]
-            # Combine TF-IDF weight with model coefficient
-            combined = tfidf_scores * np.abs(coef_scores)
-        elif hasattr(model, 'calibrated_classifiers_'):
-            # CalibratedClassifierCV wrapping LinearSVC
-            base = model.calibrated_classifiers_[0].estimator
-            if hasattr(base, 'coef_'):
-                coef_scores = base.coef_[0][nonzero]
-                combined = tfidf_scores * np.abs(coef_scores)
-            else:
-                combined = tfidf_scores
+        start, end = features.indptr[row], features.indptr[row + 1]
+        nonzero = features.indices[start:end]
+        combined = features.data[start:end]
+
+        # For linear models, combine TF-IDF weight with model coefficient
+        if artifacts.keyword_coefs is not None:
+            combined = combined * artifacts.keyword_coefs[nonzero]
+
+        # Partial selection of the top_n, then order just those
+        if len(combined) > top_n:
+            top_indices = np.argpartition(combined, -top_n)[-top_n:]
         else:
-            combined = tfidf_scores
+            top_indices = np.arange(len(combined))
+        top_indices = top_indices[np.argsort(combined[top_indices])[::-1]]
 
-        top_indices = combined.argsort()[::-1][:top_n]
-        keywords = [
-            {'word': feature_names[nonzero[i]], 'score': round(float(combined[i]), 4)}
+        return [
+            {'word': artifacts.feature_names[nonzero[i]], 'score': round(float(combined[i]), 4)}
             for i in top_indices
             if combined[i] > 0
         ]
-        return keywords[:top_n]
     except Exception as e:
         logger.debug(f"Keyword extraction failed: {e}")
         return []
 
 
+def select_salient_text(text: str, token_budget: int) -> str:
+    """
+    Compress an article to roughly `token_budget` LLM tokens by keeping its most
+    informative sentences, for use as prompt context.
+
+    Each n-gram feature is worth its IDF times the model's absolute coefficient
+    (IDF alone for models without coefficients). Starting from the lede, sentences
+    are added greedily by the value of the features they newly cover per token, so
+    the context spans as many distinct signals as fit rather than repeating one.
+    The result keeps article order, with "…" marking omissions. Text already
+    within budget is returned unchanged.
+    """
+    text = text.strip()
+    if _estimate_tokens(text) <= token_budget:
+        return text
+
+    sentences = [s for s in _SENTENCE_SPLIT_RE.split(text) if s]
+    max_chars = token_budget * _CHARS_PER_TOKEN
+    if len(sentences) < 2 or _estimate_tokens(sentences[0]) > token_budget:
+        return text[:max_chars] + "…"
+
+    artifacts = _get_artifacts()
+    features = _vectorize(artifacts.vectorizer, preprocess_batch(sentences, as_tokens=True))
+    value = np.asarray(artifacts.vectorizer.idf_, dtype=np.float64)
+    if artifacts.keyword_coefs is not None:
+        value = value * artifacts.keyword_coefs
+    rows = np.repeat(np.arange(len(sentences)), np.diff(features.indptr))
+    costs = np.array([_estimate_tokens(s) for s in sentences], dtype=np.float64)
+
+    chosen = {0}
+    budget_left = token_budget - costs[0]
+    covered = np.zeros(len(value), dtype=bool)
+    covered[features.indices[features.indptr[0]:features.indptr[1]]] = True
+    while True:
+        new_value = np.where(covered[features.indices], 0.0, value[features.indices])
+        gain = np.bincount(rows, weights=new_value, minlength=len(sentences)) / costs
+        gain[(costs > budget_left) | (gain <= 0)] = 0
+        gain[list(chosen)] = 0
+        best = int(gain.argmax())
+        if gain[best] <= 0:
+            break
+        chosen.add(best)
+        budget_left -= costs[best]
+        covered[features.indices[features.indptr[best]:features.indptr[best + 1]]] = True
+
+    pieces = []
+    for i in sorted(chosen):
+        if pieces and i - 1 not in chosen:
+            pieces.append("…")
+        pieces.append(sentences[i])
+    if max(chosen) < len(sentences) - 1:
+        pieces.append("…")
+    return ' '.join(pieces)
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
 def get_model_metrics() -> dict:
     """Return stored model metrics for display in the UI."""
     try:
@@ -151,4 +608,6 @@ def get_model_metrics() -> dict:
 
 def model_is_ready() -> bool:
     """Check if trained model artifacts exist."""
+    if USE_COMPILED_MODEL and os.path.exists(COMPILED_MODEL_PATH):
+        return True
     return os.path.exists(MODEL_PATH) and os.path.exists(VECTORIZER_PATH)
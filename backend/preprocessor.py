@@ -11,41 +11,108 @@ Implements sequential NLP preprocessing steps as defined in FR-3.x:
 import re
 import string
 import logging
-import nltk
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice
 
-# Configure NLTK data path for serverless environments (read-only FS)
-if os.environ.get('VERCEL') or os.path.exists('/tmp'):
-    nltk.data.path.append('/tmp')
+from config import NLTK_DATA_DIR
 
 logger = logging.getLogger(__name__)
 
-# Download required NLTK resources on first run
-NLTK_PACKAGES = ['punkt', 'stopwords', 'wordnet', 'omw-1.4', 'punkt_tab']
-for pkg in NLTK_PACKAGES:
-    try:
-        # Check if already present
-        if pkg == 'punkt': nltk.data.find('tokenizers/punkt')
-        elif pkg == 'stopwords': nltk.data.find('corpora/stopwords')
-        elif pkg == 'wordnet': nltk.data.find('corpora/wordnet')
-        else: nltk.data.find(pkg)
-    except LookupError:
+# NLP tools are loaded on first use by _load_nlp(). Importing this module does no
+# filesystem probing and never downloads: NLTK data is provisioned ahead of time
+# with `python setup_nltk.py` (see that module).
+_lemmatizer = None
+_stemmer = None
+_stop_words = None
+_word_tokenize = None
+
+# Optional precomputed token -> lemma table (see use_lemma_table). When set,
+# lemmatization is a dict lookup and WordNet is never loaded.
+_lemma_table = None
+
+
+def _load_nlp():
+    """Import NLTK and load the tokenizer, stop-words and stemmer/lemmatizer once."""
+    global _lemmatizer, _stemmer, _stop_words, _word_tokenize
+    if _word_tokenize is not None:
+        return
+
+    import nltk
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+    from nltk.tokenize import word_tokenize
+    from nltk.stem import PorterStemmer
+
+    _stemmer = PorterStemmer()
+    if _lemma_table is None:
+        from nltk.corpus import stopwords
+        from nltk.stem import WordNetLemmatizer
         try:
-            download_dir = '/tmp' if os.path.exists('/tmp') else None
-            nltk.download(pkg, download_dir=download_dir, quiet=True, halt_on_error=False)
-        except Exception:
-            pass # Ignore lock errors or network issues, hope for fallback
+            _stop_words = set(stopwords.words('english'))
+        except LookupError as e:
+            raise LookupError(
+                f"NLTK data not found (searched {NLTK_DATA_DIR} and NLTK defaults). "
+                "Run `python setup_nltk.py` at build/deploy time."
+            ) from e
+        _lemmatizer = WordNetLemmatizer()
+    _word_tokenize = word_tokenize
 
 
-# Import NLTK modules AFTER download
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer, PorterStemmer
+def load_resources():
+    """Eagerly load NLP resources (e.g. to pre-warm a server worker)."""
+    _load_nlp()
+    if _lemma_table is None:
+        # WordNet itself is read lazily by NLTK on the first lemmatize call
+        _lemmatizer.lemmatize('warmup')
 
-# Initialize NLP tools
-_lemmatizer = WordNetLemmatizer()
-_stemmer = PorterStemmer()
-_stop_words = set(stopwords.words('english'))
+
+def use_lemma_table(table: dict):
+    """
+    Switch lemmatization to a precomputed table built by build_lemma_table().
+
+    Tokens missing from the table are kept as-is. The table also carries the
+    stop-word set, so neither WordNet nor the stop-words corpus is loaded.
+    None switches back to WordNet (loaded again on next use).
+    """
+    global _lemma_table, _stop_words, _word_tokenize
+    if table is None:
+        _lemma_table = _stop_words = _word_tokenize = None
+        return
+    _stop_words = set(table['stop_words'])
+    _lemma_table = dict(table['lemmas'])
+    logger.info(f"Using lemma table ({len(_lemma_table)} entries, {len(_stop_words)} stop-words).")
+
+
+def build_lemma_table(texts) -> dict:
+    """
+    Lemmatize every distinct token of `texts` once with WordNet.
+
+    Args:
+        texts: Iterable of raw text strings (normally the whole training corpus).
+
+    Returns:
+        Dict with 'lemmas' (token -> lemma, only where they differ) and
+        'stop_words' (sorted list), ready for joblib serialization.
+    """
+    _load_nlp()
+    from nltk.stem import WordNetLemmatizer
+    lemmatizer = WordNetLemmatizer()
+
+    vocab = set()
+    for text in texts:
+        vocab.update(_clean_tokens(str(text)))
+
+    lemmas = {}
+    for token in vocab:
+        lemma = lemmatizer.lemmatize(token)
+        if lemma != token:
+            lemmas[token] = lemma
+    return {'lemmas': lemmas, 'stop_words': sorted(_stop_words)}
 
 
 def _lowercase(text: str) -> str:
@@ -53,23 +120,34 @@ def _lowercase(text: str) -> str:
     return text.lower()
 
 
+# Precompiled cleaning patterns (step 2)
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+# "Special chars -> space" in one translate: every character outside [a-z0-9']
+# maps to a space (non-ASCII ones are first replaced by '?'), then split/join
+# collapses the whitespace
+_KEEP_CHARS = set(string.ascii_lowercase + string.digits + "'")
+_ASCII_CLEAN_TABLE = str.maketrans({chr(c): ' ' for c in range(128) if chr(c) not in _KEEP_CHARS})
+
+
 def _remove_punctuation(text: str) -> str:
     """Step 2: Remove punctuation and special characters, keep apostrophes."""
-    # Remove URLs
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    # Remove URLs (skip the scan when no URL can be present)
+    if 'http' in text or 'www.' in text:
+        text = _URL_RE.sub('', text)
     # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    # Remove special chars but keep apostrophes for contractions
-    text = re.sub(r"[^a-z0-9\s']", ' ', text)
-    # Collapse multiple spaces
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    if '<' in text:
+        text = _HTML_TAG_RE.sub('', text)
+    # Replace special chars (keeping apostrophes) and collapse spaces
+    if not text.isascii():
+        text = text.encode('ascii', 'replace').decode('ascii')
+    return ' '.join(text.translate(_ASCII_CLEAN_TABLE).split())
 
 
 def _tokenize(text: str) -> list:
     """Step 3: Tokenize text into word tokens."""
     try:
-        tokens = word_tokenize(text)
+        tokens = _word_tokenize(text)
     except Exception:
         # Fallback: simple whitespace split
         tokens = text.split()
@@ -83,9 +161,41 @@ def _remove_stopwords(tokens: list) -> list:
 
 def _lemmatize(tokens: list) -> list:
     """Step 5: Lemmatize tokens to their base form."""
+    if _lemma_table is not None:
+        return [_lemma_table.get(t, t) for t in tokens]
     return [_lemmatizer.lemmatize(t) for t in tokens]
 
 
+def _clean_tokens(text: str) -> list:
+    """Steps 1-4: lowercase, clean, tokenize and drop stop-words."""
+    text = _lowercase(text)
+    text = _remove_punctuation(text)
+    tokens = _tokenize(text)
+    return _remove_stopwords(tokens)
+
+
+def preprocess_tokens(text: str, use_stemming: bool = False) -> list:
+    """
+    Run the full preprocessing pipeline and return the token list.
+
+    Args:
+        text: Raw input text (headline or article body).
+        use_stemming: If True, use Porter Stemmer instead of lemmatizer.
+
+    Returns:
+        List of cleaned, lemmatized (or stemmed) tokens.
+    """
+    if not isinstance(text, str) or not text.strip():
+        return []
+
+    _load_nlp()
+    tokens = _clean_tokens(text)
+
+    if use_stemming:
+        return [_stemmer.stem(t) for t in tokens]
+    return _lemmatize(tokens)
+
+
 def preprocess(text: str, use_stemming: bool = False) -> str:
     """
     Run the full preprocessing pipeline on input text.
@@ -97,31 +207,108 @@ def preprocess(text: str, use_stemming: bool = False) -> str:
     Returns:
         Cleaned, preprocessed text as a single string.
     """
-    if not isinstance(text, str) or not text.strip():
-        return ''
+    return ' '.join(preprocess_tokens(text, use_stemming))
 
-    text = _lowercase(text)
-    text = _remove_punctuation(text)
-    tokens = _tokenize(text)
-    tokens = _remove_stopwords(tokens)
 
-    if use_stemming:
-        tokens = [_stemmer.stem(t) for t in tokens]
-    else:
-        tokens = _lemmatize(tokens)
+def _preprocess_chunk(texts: list, use_stemming: bool = False, as_tokens: bool = False) -> list:
+    """Worker entry point: preprocess one chunk of texts in a child process."""
+    fn = preprocess_tokens if as_tokens else preprocess
+    return [fn(str(t), use_stemming) for t in texts]
+
 
-    return ' '.join(tokens)
+def _process_pool(n_jobs: int) -> ProcessPoolExecutor:
+    """Worker pool whose processes use the same lemma table as this one."""
+    if _lemma_table is None:
+        return ProcessPoolExecutor(max_workers=n_jobs)
+    table = {'lemmas': _lemma_table, 'stop_words': sorted(_stop_words)}
+    return ProcessPoolExecutor(max_workers=n_jobs, initializer=use_lemma_table, initargs=(table,))
 
 
-def preprocess_batch(texts: list, use_stemming: bool = False) -> list:
+def create_process_pool(n_jobs: int) -> ProcessPoolExecutor:
+    """
+    Long-lived pool for preprocess_batch(executor=...), e.g. one per server worker.
+
+    Its processes are started here, so call this before the caller runs any
+    threads. They keep the lemma table installed at this point.
+    """
+    pool = _process_pool(n_jobs)
+    pool.submit(int).result()  # fork the workers now, not inside a request
+    return pool
+
+
+def iter_chunks(items, chunk_size: int):
+    """Yield successive lists of up to chunk_size items from any iterable."""
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_preprocess(texts, use_stemming: bool = False, n_jobs: int = 1,
+                    chunk_size: int = 500, as_tokens: bool = False, executor=None):
+    """
+    Lazily preprocess any iterable of texts (list, generator, file reader...).
+
+    Texts are pulled chunk_size at a time and at most 2 * n_jobs chunks are in
+    flight, so memory stays bounded regardless of input size.
+
+    Args:
+        texts: Iterable of raw text strings.
+        use_stemming: Whether to use stemming instead of lemmatization.
+        n_jobs: Worker processes to use; 1 runs serially, -1 uses all cores.
+        chunk_size: Texts pulled from the input (and sent to a worker) at a time.
+        as_tokens: Yield token lists (see preprocess_tokens) instead of strings.
+        executor: Existing pool of n_jobs processes to use (see create_process_pool)
+            instead of starting one for this call.
+
+    Yields:
+        Preprocessed texts, in input order.
+    """
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    chunks = iter_chunks(texts, chunk_size)
+    if n_jobs == 1 and executor is None:
+        for chunk in chunks:
+            yield from _preprocess_chunk(chunk, use_stemming, as_tokens)
+        return
+
+    worker = partial(_preprocess_chunk, use_stemming=use_stemming, as_tokens=as_tokens)
+    with nullcontext(executor) if executor is not None else _process_pool(n_jobs) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(worker, chunk))
+            if len(pending) >= 2 * n_jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def preprocess_batch(texts: list, use_stemming: bool = False, n_jobs: int = 1,
+                     chunk_size: int = 500, as_tokens: bool = False, executor=None) -> list:
     """
     Preprocess a list of texts.
 
     Args:
         texts: List of raw text strings.
         use_stemming: Whether to use stemming instead of lemmatization.
+        n_jobs: Worker processes to use; 1 runs serially, -1 uses all cores.
+        chunk_size: Texts sent to a worker per task when n_jobs != 1.
+        as_tokens: Return token lists (see preprocess_tokens) instead of strings.
+        executor: Existing pool of n_jobs processes to use (see create_process_pool).
 
     Returns:
-        List of preprocessed text strings.
+        List of preprocessed texts, in input order.
     """
-    return [preprocess(str(t), use_stemming) for t in texts]
+    texts = list(texts)
+    if executor is not None:
+        return list(iter_preprocess(texts, use_stemming, n_jobs, chunk_size, as_tokens, executor))
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, -(-len(texts) // chunk_size))
+    if n_jobs <= 1:
+        return _preprocess_chunk(texts, use_stemming, as_tokens)
+
+    logger.info(f"Preprocessing {len(texts)} texts with {n_jobs} workers")
+    return list(iter_preprocess(texts, use_stemming, n_jobs, chunk_size, as_tokens))
@@ -0,0 +1,207 @@
+"""
+Upstream Call Resilience for AI-Based Fake News Detection System.
+  - CircuitBreaker: fails fast after consecutive errors, recovers through half-open probes.
+  - LatencyTracker: rolling window of recent call latencies and their percentiles.
+  - HedgedCaller:   runs a call under a deadline, optionally with a hedged second
+                    attempt once the first outlives the tracked p95 latency.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+CLOSED = 'closed'         # calls flow normally
+OPEN = 'open'             # calls are rejected until reset_timeout passes
+HALF_OPEN = 'half_open'   # a limited number of probe calls test recovery
+
+
+class CircuitBreakerOpen(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds. It then lets up to `half_open_probes` calls through:
+    a successful probe closes it, a failed one reopens it for another timeout.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float,
+                 half_open_probes: int = 1, clock=time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = float(reset_timeout)
+        self.half_open_probes = max(1, int(half_open_probes))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0        # consecutive
+        self._opened_at = 0.0
+        self._probes = 0          # probes in flight while half-open
+        self._counters = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """True if a call may go upstream now (counted as a probe when half-open)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._state = HALF_OPEN
+                self._probes += 1
+                return True
+            self._counters['rejected'] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._counters['successes'] += 1
+            if self._state != CLOSED:
+                logger.info("Circuit breaker closed: upstream recovered")
+            self._state, self._failures, self._probes = CLOSED, 0, 0
+
+    def record_failure(self):
+        with self._lock:
+            self._counters['failures'] += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._counters['opened'] += 1
+                    logger.warning(
+                        f"Circuit breaker opened after {self._failures} consecutive failure(s); "
+                        f"retrying in {self.reset_timeout:g}s"
+                    )
+                self._state, self._opened_at, self._probes = OPEN, self._clock(), 0
+
+    def _current_state(self) -> str:
+        # An open breaker turns half-open once its timeout has passed
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            retry_in = self.reset_timeout - (self._clock() - self._opened_at) if state == OPEN else None
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout_seconds': self.reset_timeout,
+                'retry_in_seconds': round(retry_in, 1) if retry_in is not None else None,
+                **self._counters,
+            }
+
+
+class LatencyTracker:
+    """Latencies (seconds) of the last `window` successful calls."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=max(1, int(window)))
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 20):
+        """The q-th percentile (0-100), or None until `min_samples` calls were seen."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+
+class HedgedCaller:
+    """
+    Runs calls on its own thread pool so the caller can give up at a deadline
+    even when the call itself does not (an abandoned attempt finishes in the
+    background; the bounded pool keeps those from piling up into new threads).
+
+    With hedging on, a second identical attempt starts once the first has run
+    longer than the tracked p95 latency (`hedge_delay` until enough calls were
+    seen), and whichever succeeds first wins.
+    """
+
+    def __init__(self, max_workers: int, timeout: float, hedge: bool = False,
+                 hedge_delay: float = 1.0, name: str = 'upstream'):
+        self.timeout = float(timeout)
+        self.hedge = bool(hedge)
+        self.hedge_delay = float(hedge_delay)
+        self.latency = LatencyTracker()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'timeouts': 0, 'errors': 0, 'hedged': 0, 'hedge_wins': 0}
+
+    def current_hedge_delay(self) -> float:
+        p95 = self.latency.percentile(95)
+        return p95 if p95 is not None else self.hedge_delay
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) and return the first successful result.
+
+        Raises:
+            TimeoutError: if no attempt succeeded within `timeout` seconds.
+            Exception:    the last attempt's error if every attempt failed.
+        """
+        with self._lock:
+            self._counters['calls'] += 1
+        start = time.monotonic()
+        deadline = start + self.timeout
+        hedge_at = start + self.current_hedge_delay() if self.hedge else None
+        attempts = [self._pool.submit(fn, *args, **kwargs)]
+        hedge = None
+        error = None
+
+        while attempts and time.monotonic() < deadline:
+            wake = min(deadline, hedge_at) if hedge_at is not None else deadline
+            done, _ = wait(attempts, timeout=max(0.0, wake - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                attempts.remove(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                self.latency.add(time.monotonic() - start)
+                if future is hedge:
+                    with self._lock:
+                        self._counters['hedge_wins'] += 1
+                return result
+            if attempts and hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                hedge = self._pool.submit(fn, *args, **kwargs)
+                attempts.append(hedge)
+                with self._lock:
+                    self._counters['hedged'] += 1
+
+        timed_out = bool(attempts) or error is None
+        for future in attempts:
+            future.cancel()
+        with self._lock:
+            self._counters['timeouts' if timed_out else 'errors'] += 1
+        if not timed_out:
+            raise error
+        raise TimeoutError(f"Upstream call exceeded its {self.timeout:g}s deadline")
+
+    def stats(self) -> dict:
+        p95 = self.latency.percentile(95)
+        with self._lock:
+            return {
+                **self._counters,
+                'timeout_seconds': self.timeout,
+                'hedging': self.hedge,
+                'hedge_delay_seconds': round(self.current_hedge_delay(), 3),
+                'p95_latency_seconds': round(p95, 3) if p95 is not None else None,
+            }
@@ -0,0 +1,291 @@
+"""
+Background Result Store for AI-Based Fake News Detection System.
+Holds Gemini analyses produced in the background until the client fetches
+them via /api/gemini-result/<request_id>.
+
+Backends share one interface (put_pending / put_result / discard / get / stats):
+  - MemoryResultStore: one process only.
+  - SQLiteResultStore: every worker process on one host (WAL mode).
+  - RedisResultStore:  workers on any number of hosts.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Lifecycle of a request_id, as reported by ResultStore.get()
+PENDING = 'pending'    # job accepted, no result yet
+READY = 'ready'        # result available
+EXPIRED = 'expired'    # result outlived its TTL, or the job outlived its timeout
+UNKNOWN = 'unknown'    # never seen (or already evicted)
+
+
+class MemoryResultStore:
+    """
+    In-process store with separate pending and ready tables.
+
+    Pending entries are never evicted for space; they stay until their job
+    stores a result or `job_timeout` passes. Ready results expire after `ttl`
+    seconds and are evicted oldest-first beyond `capacity`. Both tables are
+    OrderedDicts in deadline order, so insert, lookup and eviction are O(1).
+    """
+
+    def __init__(self, capacity: int, ttl: float, job_timeout: float, clock=time.monotonic):
+        self.capacity = max(1, int(capacity))
+        self.ttl = float(ttl)
+        self.job_timeout = float(job_timeout)
+        self._clock = clock
+        self._pending = OrderedDict()   # request_id -> deadline
+        self._ready = OrderedDict()     # request_id -> (expires_at, result)
+        self._lock = threading.Lock()
+        self._counters = {'stored': 0, 'evicted': 0, 'expired': 0, 'timed_out': 0}
+
+    def put_pending(self, request_id: str):
+        """Register a job that has been accepted but has not produced a result."""
+        now = self._clock()
+        with self._lock:
+            self._pending[request_id] = now + self.job_timeout
+            self._purge(now)
+
+    def put_result(self, request_id: str, result: dict):
+        """Store a finished result (also accepted after the job timed out)."""
+        now = self._clock()
+        with self._lock:
+            self._pending.pop(request_id, None)
+            self._ready.pop(request_id, None)
+            self._ready[request_id] = (now + self.ttl, result)
+            self._counters['stored'] += 1
+            self._purge(now)
+            while len(self._ready) > self.capacity:
+                self._ready.popitem(last=False)
+                self._counters['evicted'] += 1
+
+    def discard(self, request_id: str):
+        """Forget a request_id, e.g. when its job could not be queued."""
+        with self._lock:
+            self._pending.pop(request_id, None)
+            self._ready.pop(request_id, None)
+
+    def get(self, request_id: str) -> tuple:
+        """
+        Returns:
+            (state, result): state is PENDING, READY, EXPIRED or UNKNOWN;
+            result is the stored dict when READY, otherwise None.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._ready.get(request_id)
+            if entry is not None:
+                if entry[0] > now:
+                    return READY, entry[1]
+                del self._ready[request_id]
+                self._counters['expired'] += 1
+                return EXPIRED, None
+            deadline = self._pending.get(request_id)
+            if deadline is not None:
+                if deadline > now:
+                    return PENDING, None
+                del self._pending[request_id]
+                self._counters['timed_out'] += 1
+                return EXPIRED, None
+        return UNKNOWN, None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'pending': len(self._pending),
+                'ready': len(self._ready),
+                'capacity': self.capacity,
+                'ttl_seconds': self.ttl,
+                'job_timeout_seconds': self.job_timeout,
+                **self._counters,
+            }
+
+    def _purge(self, now: float):
+        """Drop timed-out and expired entries from the front of each table."""
+        while self._pending and next(iter(self._pending.values())) <= now:
+            self._pending.popitem(last=False)
+            self._counters['timed_out'] += 1
+        while self._ready and next(iter(self._ready.values()))[0] <= now:
+            self._ready.popitem(last=False)
+            self._counters['expired'] += 1
+
+
+class SQLiteResultStore:
+    """
+    Store shared by all worker processes on one host through a SQLite file in
+    WAL mode (readers never block the writer).
+
+    Each row carries its deadline in wall-clock time, so every process agrees
+    on pending / ready / expired. Rows whose deadline has passed are reported
+    as EXPIRED for another `ttl` seconds, then swept; ready rows beyond
+    `capacity` are swept oldest-first.
+    """
+
+    _SWEEP_EVERY = 100  # writes between sweeps
+
+    def __init__(self, path: str, capacity: int, ttl: float, job_timeout: float, clock=time.time):
+        self.path = path
+        self.capacity = max(1, int(capacity))
+        self.ttl = float(ttl)
+        self.job_timeout = float(job_timeout)
+        self._clock = clock
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " request_id TEXT PRIMARY KEY, state TEXT NOT NULL,"
+                " deadline REAL NOT NULL, result TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_state_deadline ON results (state, deadline)")
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread, reopened after a fork (e.g. gunicorn --preload)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _write(self, request_id: str, state: str, deadline: float, result):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (request_id, state, deadline, result) VALUES (?, ?, ?, ?)",
+                (request_id, state, deadline, result)
+            )
+        self._writes += 1
+        if self._writes % self._SWEEP_EVERY == 0:
+            self._sweep()
+
+    def put_pending(self, request_id: str):
+        self._write(request_id, PENDING, self._clock() + self.job_timeout, None)
+
+    def put_result(self, request_id: str, result: dict):
+        self._write(request_id, READY, self._clock() + self.ttl, json.dumps(result))
+
+    def discard(self, request_id: str):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM results WHERE request_id = ?", (request_id,))
+
+    def get(self, request_id: str) -> tuple:
+        row = self._conn().execute(
+            "SELECT state, deadline, result FROM results WHERE request_id = ?", (request_id,)
+        ).fetchone()
+        if row is None:
+            return UNKNOWN, None
+        state, deadline, result = row
+        if deadline <= self._clock():
+            return EXPIRED, None
+        if state == READY:
+            return READY, json.loads(result)
+        return PENDING, None
+
+    def _sweep(self):
+        """Delete long-expired rows and trim ready rows to capacity."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM results WHERE deadline <= ?", (self._clock() - self.ttl,))
+            conn.execute(
+                "DELETE FROM results WHERE request_id IN ("
+                " SELECT request_id FROM results WHERE state = ?"
+                " ORDER BY deadline DESC LIMIT -1 OFFSET ?)",
+                (READY, self.capacity)
+            )
+
+    def stats(self) -> dict:
+        counts = {PENDING: 0, READY: 0, EXPIRED: 0}
+        rows = self._conn().execute(
+            "SELECT state, deadline > ?, COUNT(*) FROM results GROUP BY state, deadline > ?",
+            (self._clock(),) * 2
+        ).fetchall()
+        for state, live, count in rows:
+            counts[state if live else EXPIRED] += count
+        return {
+            'backend': 'sqlite',
+            'pending': counts[PENDING],
+            'ready': counts[READY],
+            'expired': counts[EXPIRED],
+            'capacity': self.capacity,
+            'ttl_seconds': self.ttl,
+            'job_timeout_seconds': self.job_timeout,
+        }
+
+
+class RedisResultStore:
+    """
+    Store shared across hosts through Redis (or any client with the same
+    get / set(px=) / delete methods, e.g. a local stand-in in tests).
+
+    Each key holds its state and wall-clock deadline, and Redis drops it
+    `ttl` seconds after the deadline, so expired ids are still reported as
+    EXPIRED for a while. Size is bounded by the server's maxmemory policy.
+    """
+
+    def __init__(self, client, ttl: float, job_timeout: float,
+                 prefix: str = 'truthlens:gemini:', clock=time.time):
+        self.client = client
+        self.ttl = float(ttl)
+        self.job_timeout = float(job_timeout)
+        self.prefix = prefix
+        self._clock = clock
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        import redis  # optional dependency, only needed for this backend
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _set(self, request_id: str, entry: dict, lifetime: float):
+        entry['deadline'] = self._clock() + lifetime
+        self.client.set(self.prefix + request_id, json.dumps(entry),
+                        px=int((lifetime + self.ttl) * 1000))
+
+    def put_pending(self, request_id: str):
+        self._set(request_id, {'state': PENDING}, self.job_timeout)
+
+    def put_result(self, request_id: str, result: dict):
+        self._set(request_id, {'state': READY, 'result': result}, self.ttl)
+
+    def discard(self, request_id: str):
+        self.client.delete(self.prefix + request_id)
+
+    def get(self, request_id: str) -> tuple:
+        raw = self.client.get(self.prefix + request_id)
+        if raw is None:
+            return UNKNOWN, None
+        entry = json.loads(raw)
+        if entry['deadline'] <= self._clock():
+            return EXPIRED, None
+        if entry['state'] == READY:
+            return READY, entry['result']
+        return PENDING, None
+
+    def stats(self) -> dict:
+        return {
+            'backend': 'redis',
+            'ttl_seconds': self.ttl,
+            'job_timeout_seconds': self.job_timeout,
+        }
+
+
+def create_result_store(backend: str, capacity: int, ttl: float, job_timeout: float,
+                        db_path: str = None, redis_url: str = None):
+    """
+    Build the configured result store ('memory', 'sqlite' or 'redis').
+
+    Raises:
+        ValueError: for an unknown backend name.
+    """
+    if backend == 'memory':
+        return MemoryResultStore(capacity, ttl, job_timeout)
+    if backend == 'sqlite':
+        return SQLiteResultStore(db_path, capacity, ttl, job_timeout)
+    if backend == 'redis':
+        return RedisResultStore.from_url(redis_url, ttl=ttl, job_timeout=job_timeout)
+    raise ValueError(f"Unknown result store backend: {backend!r}")
@@ -0,0 +1,64 @@
+"""
+NLTK Resource Provisioning for AI-Based Fake News Detection System.
+Run once at build/deploy time so that serving processes never probe for or
+download NLTK data:
+
+    python setup_nltk.py [download_dir]
+
+Resources are stored in NLTK_DATA_DIR (config) unless a directory is given.
+"""
+
+import os
+import sys
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import NLTK_DATA_DIR
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Package id -> resource path checked with nltk.data.find
+NLTK_PACKAGES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+    'omw-1.4': 'corpora/omw-1.4',
+}
+
+
+def provision(download_dir: str = NLTK_DATA_DIR) -> bool:
+    """
+    Download any missing NLTK packages into download_dir.
+
+    Returns:
+        True if every package is available afterwards.
+    """
+    import nltk
+
+    os.makedirs(download_dir, exist_ok=True)
+    if download_dir not in nltk.data.path:
+        nltk.data.path.insert(0, download_dir)
+
+    ok = True
+    for pkg, resource in NLTK_PACKAGES.items():
+        try:
+            nltk.data.find(resource)
+            logger.info(f"  {pkg}: already present")
+            continue
+        except LookupError:
+            pass
+        logger.info(f"  {pkg}: downloading to {download_dir}")
+        if not nltk.download(pkg, download_dir=download_dir, quiet=True, raise_on_error=False):
+            logger.error(f"  {pkg}: download failed")
+            ok = False
+    return ok
+
+
+if __name__ == '__main__':
+    target = sys.argv[1] if len(sys.argv) > 1 else NLTK_DATA_DIR
+    if not provision(target):
+        sys.exit(1)
+    print(f"\n✅ NLTK resources ready in: {target}")
@@ -0,0 +1,100 @@
+"""Parity of the compiled NumPy artifact with the sklearn model it was exported from."""
+
+import os
+
+import numpy as np
+import pytest
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import LinearSVC
+
+import features
+import trainer
+from compiled_model import compile_model, load_compiled, save_compiled
+from features import NgramAnalyzer
+
+COMMON = [f'common{i}' for i in range(40)]
+REAL_WORDS = [f'report{i}' for i in range(30)]
+FAKE_WORDS = [f'shock{i}' for i in range(30)]
+
+
+def _corpus(n_docs: int, seed: int):
+    """Token lists drawn from shared and class-specific words, and their labels."""
+    rng = np.random.default_rng(seed)
+    docs, labels = [], []
+    for i in range(n_docs):
+        label = i % 2
+        own = FAKE_WORDS if label else REAL_WORDS
+        other = REAL_WORDS if label else FAKE_WORDS
+        n = int(rng.integers(8, 30))
+        pools = rng.choice(3, size=n, p=[0.5, 0.4, 0.1])
+        docs.append([str(rng.choice((COMMON, own, other)[p])) for p in pools])
+        labels.append(label)
+    return docs, np.array(labels)
+
+
+@pytest.fixture(scope='module')
+def data():
+    train_docs, y_train = _corpus(300, seed=0)
+    test_docs, _ = _corpus(100, seed=1)
+    vectorizer = TfidfVectorizer(analyzer=NgramAnalyzer((1, 2)), sublinear_tf=True, min_df=2)
+    X_train = vectorizer.fit_transform(train_docs)
+    return vectorizer, X_train, y_train, test_docs
+
+
+@pytest.mark.parametrize('model', [
+    LogisticRegression(max_iter=1000, random_state=42),
+    MultinomialNB(alpha=0.1),
+    CalibratedClassifierCV(LinearSVC(max_iter=2000, random_state=42)),
+], ids=['logistic_regression', 'naive_bayes', 'calibrated_svm'])
+def test_compiled_model_matches_sklearn(data, model, tmp_path, monkeypatch):
+    vectorizer, X_train, y_train, test_docs = data
+    model.fit(X_train, y_train)
+    X_test = vectorizer.transform(test_docs)
+    path = str(tmp_path / 'compiled_model')
+    monkeypatch.setattr(trainer, 'COMPILED_MODEL_PATH', path)
+
+    assert trainer.export_compiled_model(model, vectorizer, test_docs, X_test)
+
+    compiled_clf, compiled_vec = load_compiled(path)
+    features = compiled_vec.transform(test_docs)
+    np.testing.assert_allclose(
+        compiled_clf.predict_proba(features), model.predict_proba(X_test), rtol=0, atol=1e-8
+    )
+    np.testing.assert_array_equal(compiled_clf.predict(features), model.predict(X_test))
+
+
+def test_random_forest_is_not_exported(data, tmp_path, monkeypatch):
+    vectorizer, X_train, y_train, test_docs = data
+    model = RandomForestClassifier(n_estimators=5, random_state=42).fit(X_train, y_train)
+    path = str(tmp_path / 'compiled_model')
+    monkeypatch.setattr(trainer, 'COMPILED_MODEL_PATH', path)
+
+    with pytest.raises(ValueError):
+        compile_model(model, vectorizer)
+    assert not trainer.export_compiled_model(model, vectorizer, test_docs, vectorizer.transform(test_docs))
+    assert not os.path.exists(path)
+
+
+def test_chunked_lookup_matches_sklearn(data, tmp_path, monkeypatch):
+    vectorizer, X_train, y_train, test_docs = data
+    model = LogisticRegression(max_iter=1000, random_state=42).fit(X_train, y_train)
+    path = str(tmp_path / 'compiled_model')
+    save_compiled(compile_model(model, vectorizer), path)
+    _, compiled_vec = load_compiled(path)
+    # Tokens the analyzer must re-split, and documents with no known n-grams
+    docs = [doc + ["'s", 'n\'t', 'x'] for doc in test_docs] + [[], ['unknownword']]
+    expected = vectorizer.transform(docs).toarray()
+
+    # Lookups spread over many small chunks, hashed column by column
+    monkeypatch.setattr(compiled_vec, 'LOOKUP_CHUNK', 7)
+    monkeypatch.setattr(features, '_HASH_MATRIX_LIMIT', 0)
+    compiled = compiled_vec.transform(docs)
+    actual = np.zeros_like(expected)
+    for row in range(len(docs)):
+        cells = slice(compiled.indptr[row], compiled.indptr[row + 1])
+        actual[row, compiled.indices[cells]] = compiled.data[cells]
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
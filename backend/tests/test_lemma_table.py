@@ -0,0 +1,58 @@
+"""The lemma table is built from the training split and only saved if held-out predictions are unchanged."""
+
+import os
+
+import joblib
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+import preprocessor
+import trainer
+from features import NgramAnalyzer
+
+REAL = "Officials confirmed the report after the committee reviewed budget figures on Tuesday."
+FAKE = "Shocking secret cure doctors hide miracle pill exposed by insiders you must see."
+
+
+@pytest.fixture
+def fitted(tmp_path, monkeypatch):
+    monkeypatch.setattr(trainer, 'LEMMA_TABLE_PATH', str(tmp_path / 'lemma_table.joblib'))
+    train = [REAL, FAKE] * 10
+    held_out = [REAL.replace('Tuesday', 'Friday'), FAKE.replace('pill', 'potion')]
+    processed_train = preprocessor.preprocess_batch(train, as_tokens=True)
+    processed_check = preprocessor.preprocess_batch(held_out, as_tokens=True)
+    vectorizer = TfidfVectorizer(analyzer=NgramAnalyzer((1, 2)), sublinear_tf=True)
+    model = LogisticRegression().fit(vectorizer.fit_transform(processed_train), [0, 1] * 10)
+    yield train, held_out, processed_check, model, vectorizer
+    preprocessor.use_lemma_table(None)
+
+
+def test_table_is_saved_when_predictions_are_unchanged(fitted, monkeypatch):
+    train, held_out, processed_check, model, vectorizer = fitted
+    seen = []
+    build = preprocessor.build_lemma_table
+    monkeypatch.setattr(trainer, 'build_lemma_table', lambda texts: seen.append(list(texts)) or build(texts))
+
+    table = trainer.export_lemma_table(train, held_out, processed_check, model, vectorizer)
+
+    assert seen == [train]  # built from the training texts only
+    assert table is not None
+    assert joblib.load(trainer.LEMMA_TABLE_PATH) == table
+    assert preprocessor._lemma_table is None  # the trainer process is back on WordNet
+
+
+def test_table_that_changes_predictions_is_discarded(fitted, monkeypatch):
+    train, held_out, processed_check, model, vectorizer = fitted
+    # Map the FAKE article's words onto the REAL article's vocabulary
+    real_tokens = preprocessor.preprocess_tokens(REAL)
+    fake_tokens = preprocessor.preprocess_tokens(FAKE)
+    bad_table = {
+        'lemmas': dict(zip(fake_tokens, real_tokens * 2)),
+        'stop_words': sorted(preprocessor._stop_words),
+    }
+    monkeypatch.setattr(trainer, 'build_lemma_table', lambda texts: bad_table)
+    joblib.dump(bad_table, trainer.LEMMA_TABLE_PATH)  # stale table from an earlier run
+
+    assert trainer.export_lemma_table(train, held_out, processed_check, model, vectorizer) is None
+    assert not os.path.exists(trainer.LEMMA_TABLE_PATH)
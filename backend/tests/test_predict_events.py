@@ -0,0 +1,18 @@
+"""/api/predict/events rejects malformed bodies with INVALID_INPUT instead of failing."""
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module, 'model_is_ready', lambda: True)
+    return app_module.app.test_client()
+
+
+@pytest.mark.parametrize('body', [[], ['x'], 'text', 42, {'text': ['x']}, {'text': 5}])
+def test_non_object_json_is_invalid_input(client, body):
+    response = client.post('/api/predict/events', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'INVALID_INPUT'
@@ -0,0 +1,106 @@
+"""reload_model() swaps in a complete new artifact set without a gap; workers notice new artifacts on disk."""
+
+import pytest
+
+import predictor
+
+
+@pytest.fixture(autouse=True)
+def no_disk_checks(monkeypatch):
+    # Tests that exercise change detection turn it back on themselves
+    monkeypatch.setattr(predictor, 'MODEL_CHECK_INTERVAL', 0)
+
+
+def _artifacts(version: str) -> predictor._Artifacts:
+    return predictor._Artifacts(
+        model=object(), vectorizer=object(), metrics={}, feature_names=[],
+        keyword_coefs=None, version=version,
+    )
+
+
+def test_reload_serves_old_artifacts_until_swap(monkeypatch):
+    old, new = _artifacts('old'), _artifacts('new')
+    monkeypatch.setattr(predictor, '_artifacts', old)
+    predictor._prediction_cache.set('key', {'label': 'REAL'})
+    seen_while_loading = []
+
+    def read_artifacts():
+        seen_while_loading.append((predictor._get_artifacts(), len(predictor._prediction_cache)))
+        return new, None
+
+    monkeypatch.setattr(predictor, '_read_artifacts', read_artifacts)
+
+    assert predictor.reload_model() == 'new'
+    # Requests during the load still got the old set and the cache was intact
+    assert seen_while_loading == [(old, 1)]
+    assert predictor._get_artifacts() is new
+    assert len(predictor._prediction_cache) == 0
+    assert predictor.get_cache_stats()['model_version'] == 'new'
+
+
+def test_failed_reload_keeps_current_artifacts(monkeypatch):
+    current = _artifacts('current')
+    monkeypatch.setattr(predictor, '_artifacts', current)
+
+    def read_artifacts():
+        raise FileNotFoundError('model.pkl')
+
+    monkeypatch.setattr(predictor, '_read_artifacts', read_artifacts)
+
+    with pytest.raises(FileNotFoundError):
+        predictor.reload_model()
+    assert predictor._get_artifacts() is current
+
+
+def test_worker_picks_up_settled_artifacts_itself(monkeypatch):
+    old, new = _artifacts('old'), _artifacts('new')
+    monkeypatch.setattr(predictor, '_artifacts', old)
+    monkeypatch.setattr(predictor, '_seen_version', None)
+    monkeypatch.setattr(predictor, 'MODEL_CHECK_INTERVAL', 10.0)
+    monkeypatch.setattr(predictor, '_read_artifacts', lambda: (new, None))
+    on_disk = iter(['old', 'writing', 'new', 'new'])
+    monkeypatch.setattr(predictor, '_disk_version', lambda: next(on_disk))
+
+    served = []
+    for _ in range(4):
+        monkeypatch.setattr(predictor, '_next_check', 0.0)  # check interval elapsed
+        served.append(predictor._get_artifacts().version)
+    # 'writing' and the first sighting of 'new' are not loaded: not yet stable
+    assert served == ['old', 'old', 'old', 'new']
+
+    # Between checks the disk is not consulted at all
+    assert predictor._get_artifacts() is new
+
+
+def test_failed_automatic_reload_keeps_serving(monkeypatch):
+    current = _artifacts('current')
+    monkeypatch.setattr(predictor, '_artifacts', current)
+    monkeypatch.setattr(predictor, '_seen_version', 'broken')
+    monkeypatch.setattr(predictor, '_next_check', 0.0)
+    monkeypatch.setattr(predictor, 'MODEL_CHECK_INTERVAL', 10.0)
+    monkeypatch.setattr(predictor, '_disk_version', lambda: 'broken')
+
+    def read_artifacts():
+        raise EOFError('truncated vectorizer')
+
+    monkeypatch.setattr(predictor, '_read_artifacts', read_artifacts)
+    assert predictor._get_artifacts() is current
+
+
+def test_reload_endpoint_requires_admin_token(monkeypatch):
+    import app as app_module
+
+    monkeypatch.setattr(app_module, 'reload_model', lambda: 'new')
+    client = app_module.app.test_client()
+
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', '')
+    assert client.post('/api/model/reload').status_code == 404
+
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', 's3cret')
+    assert client.post('/api/model/reload').status_code == 401
+    wrong = client.post('/api/model/reload', headers={'Authorization': 'Bearer guess'})
+    assert wrong.status_code == 401 and wrong.get_json()['code'] == 'UNAUTHORIZED'
+
+    response = client.post('/api/model/reload', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200
+    assert response.get_json() == {'reloaded': True, 'model_version': 'new'}
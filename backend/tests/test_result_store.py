@@ -0,0 +1,129 @@
+"""Pending -> ready -> expired lifecycle, identical across every result store backend."""
+
+import pytest
+
+from result_store import (
+    MemoryResultStore, SQLiteResultStore, RedisResultStore,
+    PENDING, READY, EXPIRED, UNKNOWN
+)
+
+TTL = 60.0
+JOB_TIMEOUT = 30.0
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class FakeRedis:
+    """
+    The subset of redis.Redis that RedisResultStore calls: get, set(px=) and
+    delete, with keys dropped once their px lifetime has passed on `clock`.
+    """
+
+    def __init__(self, clock):
+        self._clock = clock
+        self._data = {}   # key -> (value bytes, expires_at or None)
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            return None
+        return value
+
+    def set(self, key, value, px=None):
+        if isinstance(value, str):
+            value = value.encode('utf-8')  # redis-py returns bytes
+        self._data[key] = (value, self._clock() + px / 1000 if px is not None else None)
+        return True
+
+    def delete(self, *keys):
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def store(request, clock, tmp_path):
+    if request.param == 'memory':
+        return MemoryResultStore(10, TTL, JOB_TIMEOUT, clock=clock)
+    if request.param == 'sqlite':
+        return SQLiteResultStore(str(tmp_path / 'results.db'), 10, TTL, JOB_TIMEOUT, clock=clock)
+    return RedisResultStore(FakeRedis(clock), TTL, JOB_TIMEOUT, clock=clock)
+
+
+def test_pending_then_ready_then_expired(store, clock):
+    store.put_pending('job')
+    assert store.get('job') == (PENDING, None)
+
+    clock.advance(JOB_TIMEOUT / 2)
+    store.put_result('job', {'gemini_verdict': 'FAKE'})
+    assert store.get('job') == (READY, {'gemini_verdict': 'FAKE'})
+
+    clock.advance(TTL - 1)
+    assert store.get('job')[0] == READY
+    clock.advance(1)
+    assert store.get('job') == (EXPIRED, None)
+
+
+def test_job_timeout_expires_pending(store, clock):
+    store.put_pending('job')
+    clock.advance(JOB_TIMEOUT)
+    assert store.get('job') == (EXPIRED, None)
+
+
+def test_unknown_and_discarded(store):
+    assert store.get('missing') == (UNKNOWN, None)
+    store.put_pending('job')
+    store.discard('job')
+    assert store.get('job') == (UNKNOWN, None)
+
+
+def test_redis_drops_keys_after_expiry_grace(clock):
+    redis = FakeRedis(clock)
+    store = RedisResultStore(redis, TTL, JOB_TIMEOUT, clock=clock)
+    store.put_result('job', {'gemini_verdict': 'REAL'})
+
+    clock.advance(TTL)
+    assert store.get('job') == (EXPIRED, None)
+    clock.advance(TTL)
+    assert store.get('job') == (UNKNOWN, None)
+    assert redis.get(store.prefix + 'job') is None
+
+
+def test_gemini_result_endpoint_with_redis_store(clock, monkeypatch):
+    import app as app_module
+
+    store = RedisResultStore(FakeRedis(clock), TTL, JOB_TIMEOUT, clock=clock)
+    monkeypatch.setattr(app_module, '_gemini_results', store)
+    client = app_module.app.test_client()
+
+    store.put_pending('job')
+    response = client.get('/api/gemini-result/job')
+    assert response.status_code == 200 and response.get_json() == {'ready': False}
+
+    store.put_result('job', {'gemini_verdict': 'FAKE'})
+    response = client.get('/api/gemini-result/job')
+    assert response.status_code == 200
+    assert response.get_json() == {'ready': True, 'gemini': {'gemini_verdict': 'FAKE'}}
+
+    clock.advance(TTL)
+    response = client.get('/api/gemini-result/job')
+    assert response.status_code == 410
+    assert response.get_json()['code'] == 'RESULT_EXPIRED'
+
+    assert client.get('/api/gemini-result/never-seen').status_code == 404
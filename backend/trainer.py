@@ -23,11 +23,14 @@ from sklearn.metrics import (
 from sklearn.pipeline import Pipeline
 from sklearn.calibration import CalibratedClassifierCV
 
-from preprocessor import preprocess_batch
+from preprocessor import preprocess_batch, build_lemma_table, use_lemma_table
+from features import NgramAnalyzer
+from compiled_model import compile_model, save_compiled, load_compiled, remove_compiled
 from config import (
-    MODEL_PATH, VECTORIZER_PATH, METRICS_PATH,
+    MODEL_PATH, VECTORIZER_PATH, METRICS_PATH, LEMMA_TABLE_PATH, COMPILED_MODEL_PATH,
     TFIDF_MAX_FEATURES, TFIDF_NGRAM_RANGE,
-    TRAIN_RATIO, VAL_RATIO, TEST_RATIO
+    TRAIN_RATIO, VAL_RATIO, TEST_RATIO,
+    PREPROCESS_N_JOBS, PREPROCESS_CHUNK_SIZE
 )
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -57,20 +60,40 @@ def load_dataset(data_path: str) -> pd.DataFrame:
     return df
 
 
+def iter_dataset_texts(data_path: str, chunksize: int = 10000):
+    """
+    Stream the article texts of a CSV dataset without loading it whole.
+
+    Uses the same text-column detection and title + text combination as
+    prepare_data(); rows without text are skipped. Pair with
+    preprocessor.iter_preprocess() or predictor.predict_stream(). Training
+    itself still loads the dataset whole (see train_and_evaluate).
+    """
+    logger.info(f"Streaming dataset from: {data_path} ({chunksize} rows per chunk)")
+    for df in pd.read_csv(data_path, chunksize=chunksize):
+        text_col = _detect_text_column(df)
+        if 'title' in df.columns and text_col != 'title':
+            texts = df['title'].fillna('') + ' ' + df[text_col].fillna('')
+        else:
+            texts = df[text_col].dropna()
+        yield from texts.astype(str).tolist()
+
+
+def _detect_text_column(df: pd.DataFrame) -> str:
+    """Flexible text column detection."""
+    for col in ['text', 'body', 'content', 'article', 'news', 'headline', 'title']:
+        if col in df.columns:
+            return col
+    # Use first string column
+    return df.select_dtypes(include='object').columns[0]
+
+
 def prepare_data(df: pd.DataFrame):
     """
     Identify text and label columns, clean and prepare data.
     Returns X (text series) and y (binary int labels).
     """
-    # Flexible column detection
-    text_col = None
-    for col in ['text', 'body', 'content', 'article', 'news', 'headline', 'title']:
-        if col in df.columns:
-            text_col = col
-            break
-    if text_col is None:
-        # Use first string column
-        text_col = df.select_dtypes(include='object').columns[0]
+    text_col = _detect_text_column(df)
 
     label_col = None
     for col in ['label', 'class', 'fake', 'target', 'category']:
@@ -106,6 +129,23 @@ def prepare_data(df: pd.DataFrame):
     return X, y
 
 
+def split_indices(y) -> tuple:
+    """
+    Row indices of the stratified 70/15/15 train/val/test split.
+
+    Depends only on the labels, so rebuilding an artifact later (e.g.
+    rebuild_lemma_table) recovers exactly the split the model was trained on.
+    """
+    rows = np.arange(len(y))
+    test_size = TEST_RATIO + VAL_RATIO
+    train_val_idx, test_idx = train_test_split(rows, test_size=test_size, random_state=42, stratify=y)
+    val_size_rel = VAL_RATIO / (TRAIN_RATIO + VAL_RATIO)
+    train_idx, val_idx = train_test_split(
+        train_val_idx, test_size=val_size_rel, random_state=42, stratify=y[train_val_idx]
+    )
+    return train_idx, val_idx, test_idx
+
+
 def train_and_evaluate(data_path: str) -> dict:
     """
     Full training pipeline:
@@ -116,30 +156,33 @@ def train_and_evaluate(data_path: str) -> dict:
     5. Evaluate and select best model
     6. Serialize artifacts
     Returns dict with all model metrics.
+
+    Training holds the whole dataset in memory: the split, the vectorizer's
+    max_features ranking and the RF/SVM classifiers all need every row at once.
+    Only scoring streams (iter_dataset_texts + predictor.predict_stream).
     """
-    df = load_dataset(data_path)
-    X_raw, y = prepare_data(df)
+    # No reference to the DataFrame is kept, so it is freed once the texts are extracted
+    X_raw, y = prepare_data(load_dataset(data_path))
 
     logger.info("Running text preprocessing pipeline...")
-    X_processed = preprocess_batch(X_raw.tolist())
+    X_raw, y = X_raw.tolist(), np.asarray(y)
+    X_processed = preprocess_batch(
+        X_raw, n_jobs=PREPROCESS_N_JOBS, chunk_size=PREPROCESS_CHUNK_SIZE, as_tokens=True
+    )
 
     # Three-way split: 70% train, 15% val, 15% test
-    test_size = TEST_RATIO + VAL_RATIO
-    X_train_val, X_test, y_train_val, y_test = train_test_split(
-        X_processed, y, test_size=test_size, random_state=42, stratify=y
-    )
-    val_size_rel = VAL_RATIO / (TRAIN_RATIO + VAL_RATIO)
-    X_train, X_val, y_train, y_val = train_test_split(
-        X_train_val, y_train_val, test_size=val_size_rel, random_state=42, stratify=y_train_val
-    )
+    train_idx, val_idx, test_idx = split_indices(y)
+    X_train, X_val, X_test = ([X_processed[i] for i in idx] for idx in (train_idx, val_idx, test_idx))
+    y_train, y_val, y_test = y[train_idx], y[val_idx], y[test_idx]
 
     logger.info(f"Split sizes — Train: {len(X_train)}, Val: {len(X_val)}, Test: {len(X_test)}")
 
     # TF-IDF vectorizer fitted only on training data (FR-4.2)
     logger.info("Fitting TF-IDF vectorizer on training data...")
+    # Documents are token lists; the analyzer builds n-grams without re-tokenizing
     vectorizer = TfidfVectorizer(
+        analyzer=NgramAnalyzer(TFIDF_NGRAM_RANGE),
         max_features=TFIDF_MAX_FEATURES,
-        ngram_range=TFIDF_NGRAM_RANGE,
         sublinear_tf=True,
         min_df=2
     )
@@ -210,6 +253,11 @@ def train_and_evaluate(data_path: str) -> dict:
     logger.info(f"Model saved: {MODEL_PATH}")
     logger.info(f"Vectorizer saved: {VECTORIZER_PATH}")
 
+    export_compiled_model(best_clf, vectorizer, X_test, X_test_tfidf)
+    export_lemma_table(
+        [X_raw[i] for i in train_idx], [X_raw[i] for i in test_idx], X_test, best_clf, vectorizer
+    )
+
     results = {
         'best_model': best_model_name,
         'best_f1': round(best_f1, 4),
@@ -226,6 +274,115 @@ def train_and_evaluate(data_path: str) -> dict:
     return results
 
 
+def export_compiled_model(model, vectorizer, X_check: list, X_check_tfidf) -> bool:
+    """
+    Compile the model + vectorizer into the sklearn-free NumPy artifact.
+
+    The compiled scorer must reproduce the sklearn probabilities on X_check
+    (token lists whose sklearn features are X_check_tfidf); otherwise, or when
+    the model type cannot be compiled, no artifact is left on disk so the
+    predictor falls back to the joblib files.
+    """
+    remove_compiled(COMPILED_MODEL_PATH)
+    try:
+        artifact = compile_model(model, vectorizer)
+    except ValueError as e:
+        logger.info(f"Compiled model not exported: {e}")
+        return False
+
+    save_compiled(artifact, COMPILED_MODEL_PATH)
+    compiled_clf, compiled_vec = load_compiled(COMPILED_MODEL_PATH)
+    expected = model.predict_proba(X_check_tfidf)
+    actual = compiled_clf.predict_proba(compiled_vec.transform(X_check))
+    max_diff = float(np.abs(expected - actual).max()) if len(X_check) else 0.0
+    labels_match = bool((expected.argmax(axis=1) == actual.argmax(axis=1)).all())
+    if max_diff > 1e-8 or not labels_match:
+        remove_compiled(COMPILED_MODEL_PATH)
+        logger.warning(
+            f"Compiled model discarded: max |Δp| = {max_diff:.2e}, labels match = {labels_match}"
+        )
+        return False
+
+    logger.info(
+        f"Compiled model saved: {COMPILED_MODEL_PATH} "
+        f"(parity on {len(X_check)} test texts, max |Δp| = {max_diff:.2e})"
+    )
+    return True
+
+
+def export_lemma_table(train_texts: list, raw_check: list, processed_check: list,
+                       model, vectorizer) -> dict:
+    """
+    Build the token->lemma table used at inference instead of WordNet, and save
+    it only if it leaves the model's predictions unchanged.
+
+    The table covers the tokens of `train_texts` (the training split only).
+    `raw_check` (a held-out split whose WordNet preprocessing is
+    `processed_check`) is re-preprocessed in table mode and scored both ways.
+    Any changed prediction discards the table, and the predictor keeps using
+    WordNet.
+
+    Returns:
+        The table, or None if it was discarded.
+    """
+    if os.path.exists(LEMMA_TABLE_PATH):
+        os.remove(LEMMA_TABLE_PATH)  # never leave a table from an earlier model behind
+
+    logger.info(f"Building lemma table from {len(train_texts)} training texts...")
+    table = build_lemma_table(train_texts)
+    use_lemma_table(table)
+    try:
+        table_processed = preprocess_batch(
+            raw_check, n_jobs=PREPROCESS_N_JOBS, chunk_size=PREPROCESS_CHUNK_SIZE, as_tokens=True
+        )
+    finally:
+        use_lemma_table(None)
+
+    changed_texts = sum(a != b for a, b in zip(table_processed, processed_check))
+    changed_predictions = 0
+    if changed_texts:
+        expected = model.predict(vectorizer.transform(processed_check))
+        actual = model.predict(vectorizer.transform(table_processed))
+        changed_predictions = int((expected != actual).sum())
+
+    if changed_predictions:
+        logger.error(
+            f"Lemma table discarded: it changes {changed_predictions}/{len(raw_check)} held-out "
+            f"predictions ({changed_texts} texts preprocess differently). Serving keeps WordNet."
+        )
+        return None
+
+    joblib.dump(table, LEMMA_TABLE_PATH, compress=3)
+    logger.info(
+        f"Lemma table saved: {LEMMA_TABLE_PATH} "
+        f"({len(table['lemmas'])} lemmas, {len(table['stop_words'])} stop-words); "
+        f"0/{len(raw_check)} held-out predictions changed, {changed_texts} texts preprocess differently"
+    )
+    return table
+
+
+def rebuild_lemma_table(data_path: str) -> dict:
+    """
+    Export the lemma table for the already-trained model, without retraining.
+
+    Recovers the training/test split of `data_path` with split_indices(), so
+    this must be the dataset the saved model was trained on.
+    """
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError(f"No trained model found at {MODEL_PATH}. Run trainer.py first.")
+    X_raw, y = prepare_data(load_dataset(data_path))
+    X_raw = X_raw.tolist()
+    train_idx, _, test_idx = split_indices(np.asarray(y))
+    raw_test = [X_raw[i] for i in test_idx]
+    processed_test = preprocess_batch(
+        raw_test, n_jobs=PREPROCESS_N_JOBS, chunk_size=PREPROCESS_CHUNK_SIZE, as_tokens=True
+    )
+    return export_lemma_table(
+        [X_raw[i] for i in train_idx], raw_test, processed_test,
+        joblib.load(MODEL_PATH), joblib.load(VECTORIZER_PATH)
+    )
+
+
 if __name__ == '__main__':
     import sys
     import os
@@ -236,5 +393,10 @@ if __name__ == '__main__':
         logger.error(f"Dataset not found at {data_file}. Please run generate_dataset.py first.")
         sys.exit(1)
 
+    if '--lemma-table' in sys.argv[1:]:
+        # Only (re)build the lemma table for the saved model
+        table = rebuild_lemma_table(data_file)
+        sys.exit(0 if table is not None else 1)
+
     results = train_and_evaluate(data_file)
     print(f"\n✅ Training complete! Best model: {results['best_model']} | F1: {results['best_f1']}")
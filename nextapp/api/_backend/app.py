@@ -18,6 +18,7 @@ from werkzeug.utils import secure_filename
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from predictor import predict, get_model_metrics, model_is_ready
+from preprocessor import nlp_is_ready, NLPResourcesMissing
 from config import MIN_INPUT_CHARS, MAX_INPUT_WORDS, PORT, HOST, DEBUG
 from gemini_analyzer import analyze_with_gemini, gemini_is_available
 
@@ -101,6 +102,14 @@ def validate_text(text: str) -> tuple[bool, str]:
     return True, ""
 
 
+def nlp_unavailable_response():
+    """503 for predictions while the NLTK data is missing from the deployment."""
+    return api_response({
+        'error': 'Text preprocessing resources are not installed on the server.',
+        'code': 'NLP_NOT_READY'
+    }, 503)
+
+
 def api_response(data: dict, status: int = 200):
     """Standardized API response wrapper using safe numpy-aware encoder."""
     from flask import current_app
@@ -141,8 +150,9 @@ def static_files(filename):
 def health_check():
     """Health check endpoint."""
     return api_response({
-        'status': 'healthy',
+        'status': 'healthy' if nlp_is_ready() else 'degraded',
         'model_ready': model_is_ready(),
+        'nlp_ready': nlp_is_ready(),
         'version': '1.0.0',
         'timestamp': time.time()
     })
@@ -163,6 +173,8 @@ def predict_endpoint():
             'error': 'Model not trained yet. Please run the training script first.',
             'code': 'MODEL_NOT_READY'
         }, 503)
+    if not nlp_is_ready():
+        return nlp_unavailable_response()
 
     # Parse input
     if request.is_json:
@@ -207,6 +219,8 @@ def predict_endpoint():
 
     except FileNotFoundError as e:
         return api_response({'error': str(e), 'code': 'MODEL_NOT_FOUND'}, 503)
+    except NLPResourcesMissing:
+        return nlp_unavailable_response()
     except ValueError as e:
         return api_response({'error': str(e), 'code': 'PROCESSING_ERROR'}, 400)
     except Exception as e:
@@ -222,6 +236,8 @@ def predict_file():
     """
     if not model_is_ready():
         return api_response({'error': 'Model not trained yet.', 'code': 'MODEL_NOT_READY'}, 503)
+    if not nlp_is_ready():
+        return nlp_unavailable_response()
 
     if 'file' not in request.files:
         return api_response({'error': 'No file provided.', 'code': 'NO_FILE'}, 400)
@@ -259,6 +275,8 @@ def predict_file():
             result['gemini'] = {'gemini_available': False}
         return api_response(result)
 
+    except NLPResourcesMissing:
+        return nlp_unavailable_response()
     except Exception as e:
         logger.exception(f"File prediction error: {e}")
         return api_response({'error': 'Failed to process file.', 'code': 'FILE_ERROR'}, 500)
@@ -280,6 +298,7 @@ def system_status():
     logger.info(f"Status check: model_ready={ready}")
     return api_response({
         'model_ready': ready,
+        'nlp_ready': nlp_is_ready(),
         'gemini_available': gemini_is_available(),
         'version': '1.0.0'
     })
@@ -19,6 +19,9 @@ else:
     for d in [MODEL_DIR, DATA_DIR, LOGS_DIR]:
         os.makedirs(d, exist_ok=True)
 
+# NLTK data, bundled at deploy time by setup_nltk.py
+NLTK_DATA_DIR = os.environ.get('NLTK_DATA_DIR', os.path.join(BASE_DIR, 'nltk_data'))
+
 # Model settings
 MODEL_PATH = os.path.join(MODEL_DIR, 'best_model.joblib')
 VECTORIZER_PATH = os.path.join(MODEL_DIR, 'tfidf_vectorizer.joblib')
@@ -11,55 +11,59 @@ Implements sequential NLP preprocessing steps as defined in FR-3.x:
 import re
 import string
 import logging
-import nltk
 import os
 
-# Configure NLTK data path for serverless environments (read-only FS)
-if os.environ.get('VERCEL') or os.path.exists('/tmp'):
-    nltk.data.path.append('/tmp')
+from config import NLTK_DATA_DIR
 
 logger = logging.getLogger(__name__)
 
-# Initialize NLP tools with fallback
+# NLP tools are loaded on first use by _load_nlp(). Importing this module does no
+# filesystem probing and never downloads: NLTK data is bundled with the deployment
+# by running `python api/_backend/setup_nltk.py` before `vercel deploy`. Without it
+# preprocess() raises NLPResourcesMissing rather than feed the model raw text.
 _lemmatizer = None
 _stemmer = None
 _stop_words = set()
-_nltk_ready = False
-
-try:
-    # Download required NLTK resources on first run
-    NLTK_PACKAGES = ['punkt', 'stopwords', 'wordnet', 'omw-1.4', 'punkt_tab']
-    for pkg in NLTK_PACKAGES:
-        try:
-            # Try to find it first to avoid redundant downloads
-            try:
-                if pkg == 'punkt': nltk.data.find('tokenizers/punkt')
-                elif pkg == 'stopwords': nltk.data.find('corpora/stopwords')
-                elif pkg == 'wordnet': nltk.data.find('corpora/wordnet')
-                else: nltk.data.find(pkg)
-            except LookupError:
-                 # Download to /tmp if not found
-                 download_dir = '/tmp' if os.path.exists('/tmp') else None
-                 if download_dir:
-                     nltk.download(pkg, download_dir=download_dir, quiet=True)
-                 else:
-                     nltk.download(pkg, quiet=True)
-        except Exception:
-            pass
-
-    # Import NLTK modules AFTER download
-    from nltk.corpus import stopwords
-    from nltk.tokenize import word_tokenize
-    from nltk.stem import WordNetLemmatizer, PorterStemmer
-    
-    _lemmatizer = WordNetLemmatizer()
-    _stemmer = PorterStemmer()
-    _stop_words = set(stopwords.words('english'))
-    _nltk_ready = True
-    
-except Exception as e:
-    logger.warning(f"NLTK initialization failed: {e}. Using basic fallback.")
-    _nltk_ready = False
+_word_tokenize = None
+_nltk_ready = None  # None = not loaded yet
+
+
+class NLPResourcesMissing(RuntimeError):
+    """NLTK data is not installed, so text cannot be preprocessed like the training data."""
+
+
+def _load_nlp() -> bool:
+    """Import NLTK and load NLP tools once. Returns False if the data is missing."""
+    global _lemmatizer, _stemmer, _stop_words, _word_tokenize, _nltk_ready
+    if _nltk_ready is not None:
+        return _nltk_ready
+
+    try:
+        import nltk
+        if NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+        from nltk.corpus import stopwords
+        from nltk.tokenize import word_tokenize
+        from nltk.stem import WordNetLemmatizer, PorterStemmer
+
+        _stop_words = set(stopwords.words('english'))
+        _lemmatizer = WordNetLemmatizer()
+        _stemmer = PorterStemmer()
+        _word_tokenize = word_tokenize
+        _nltk_ready = True
+    except Exception as e:
+        logger.error(
+            f"NLTK initialization failed: {e}. Predictions are disabled; "
+            "run `python api/_backend/setup_nltk.py` before deploying."
+        )
+        _nltk_ready = False
+    return _nltk_ready
+
+
+def nlp_is_ready() -> bool:
+    """True if the NLTK data needed by preprocess() is available."""
+    return _load_nlp()
 
 
 def _lowercase(text: str) -> str:
@@ -83,7 +87,7 @@ def _remove_punctuation(text: str) -> str:
 def _tokenize(text: str) -> list:
     """Step 3: Tokenize text into word tokens."""
     try:
-        tokens = word_tokenize(text)
+        tokens = _word_tokenize(text)
     except Exception:
         # Fallback: simple whitespace split
         tokens = text.split()
@@ -110,16 +114,20 @@ def preprocess(text: str, use_stemming: bool = False) -> str:
 
     Returns:
         Cleaned, preprocessed text as a single string.
+
+    Raises:
+        NLPResourcesMissing: if the NLTK data is not bundled with the deployment.
     """
     if not isinstance(text, str) or not text.strip():
         return ''
 
+    if not _load_nlp():
+        raise NLPResourcesMissing(
+            "NLTK data is missing; run `python api/_backend/setup_nltk.py` before deploying."
+        )
+
     text = _lowercase(text)
     text = _remove_punctuation(text)
-    
-    # Fallback if NLTK failed to load
-    if not _nltk_ready:
-        return text
 
     tokens = _tokenize(text)
     tokens = _remove_stopwords(tokens)